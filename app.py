@@ -1,12 +1,16 @@
 # app.py
 from flask import (
     Flask, render_template, request, redirect, url_for,
-    flash, session, jsonify, abort, g
+    flash, session, jsonify, abort, g, has_request_context
 )
 import calendar
+import atexit
+import bisect
 import json, os, uuid, secrets, contextlib, tempfile
+import threading
 from datetime import datetime, timedelta, date, time as dtime
 from functools import wraps, lru_cache
+from operator import itemgetter
 from flask_login import (
     LoginManager,
     UserMixin,
@@ -56,6 +60,16 @@ try:
 except ImportError:
     portalocker = None
 
+try:
+    import orjson  # type: ignore[import]
+except ImportError:
+    orjson = None
+
+try:
+    from argon2 import PasswordHasher  # type: ignore[import]
+except ImportError:
+    PasswordHasher = None
+
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "dev-only-key")
 app.config.update(
@@ -92,6 +106,7 @@ TITLES_FILE           = data_path("titles.json")
 GROUPS_FILE           = data_path("group_chats.json")
 GROUP_TASKS_FILE      = data_path("group_tasks.json")
 GROUP_MESSAGES_FILE   = data_path("group_messages.json")
+GROUP_MESSAGES_DIR    = data_path("group_messages")
 GROUP_SEEN_FILE       = data_path("group_seen.json")
 BADGES_FILE           = data_path("badges.json")
 USER_BADGES_FILE      = data_path("user_badges.json")
@@ -101,7 +116,7 @@ PREFERENCES_FILE      = data_path("preferences.json")
 PASSWORD_RESETS_FILE  = data_path("password_resets.json")   # forgot/reset flow
 
 UPLOAD_FOLDER         = "static/uploads"
-ALLOWED_EXTS          = {"png","jpg","jpeg","gif"}
+ALLOWED_EXTS          = frozenset({"png","jpg","jpeg","gif"})
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
@@ -119,6 +134,7 @@ SessionLocal: Optional[sessionmaker] | None = None
 UserModel = None
 TaskModel = None
 ShiftModel = None
+JsonDocModel = None
 Base = None
 
 if DB_ENABLED:
@@ -206,6 +222,12 @@ if DB_ENABLED:
         user = relationship("UserModel", back_populates="badge_links")
         badge = relationship("BadgeModel", back_populates="users")
 
+    class JsonDocModel(Base):
+        __tablename__ = "json_docs"
+        key = Column(String(64), primary_key=True)
+        data = Column(JSON, nullable=False)
+        updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
     Base.metadata.create_all(bind=engine)
 else:
     Base = None
@@ -342,33 +364,81 @@ def with_json_lock(path: str):
             lock_file.close()
 
 
+# Parsed-JSON cache keyed by path; entries are (st_mtime_ns, parsed data) so
+# unchanged files skip the lock/read/parse entirely on repeat loads.
+_JSON_CACHE: Dict[str, tuple[int, Any]] = {}
+# Encoded bytes of the last payload this process wrote per path, used to skip
+# rewrites that would store identical content.
+_JSON_PAYLOADS: Dict[str, bytes] = {}
+
+
 def save_json_atomic(path, data):
     directory = os.path.dirname(path) or "."
     os.makedirs(directory, exist_ok=True)
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
     with with_json_lock(path):
+        # Skip the write+fsync+rename dance when the file already holds this
+        # exact payload and nobody else has touched it since we wrote it.
+        cached = _JSON_CACHE.get(path)
+        if cached is not None and _JSON_PAYLOADS.get(path) == payload:
+            try:
+                if os.stat(path).st_mtime_ns == cached[0]:
+                    return
+            except OSError:
+                pass
         fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
                 f.flush()
                 os.fsync(f.fileno())
             os.replace(tmp, path)
+            # Make the rename itself durable, not just the file contents.
+            try:
+                dir_fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            except OSError:
+                pass
         finally:
             try:
                 os.remove(tmp)
             except OSError:
                 pass
+        try:
+            _JSON_CACHE[path] = (os.stat(path).st_mtime_ns, data)
+            _JSON_PAYLOADS[path] = payload
+        except OSError:
+            _JSON_CACHE.pop(path, None)
+            _JSON_PAYLOADS.pop(path, None)
 
 
 def load_json(path, default):
+    try:
+        cached = _JSON_CACHE.get(path)
+        if cached is not None and cached[0] == os.stat(path).st_mtime_ns:
+            return cached[1]
+    except OSError:
+        pass
     try:
         with with_json_lock(path):
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            mtime = os.stat(path).st_mtime_ns
+            # Unbuffered: the whole file is read in one go, so the extra
+            # BufferedReader copy is pure overhead.
+            with open(path, "rb", buffering=0) as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        _JSON_CACHE[path] = (mtime, data)
+        return data
     except FileNotFoundError:
         save_json_atomic(path, default)
         return default
-    except json.JSONDecodeError:
+    except ValueError:
         return default
     except OSError:
         return default
@@ -379,7 +449,32 @@ def save_json(path, data):
 
 
 def allowed_file(fn):
-    return "." in fn and fn.rsplit(".",1)[1].lower() in ALLOWED_EXTS
+    dot = fn.rfind(".")
+    return dot != -1 and fn[dot+1:].lower() in ALLOWED_EXTS
+
+_password_hasher = PasswordHasher() if PasswordHasher is not None else None
+
+
+def hash_password(password: str) -> str:
+    """Hash with argon2 when installed (faster C verifier, GPU-resistant); werkzeug otherwise."""
+    if _password_hasher is not None:
+        return _password_hasher.hash(password)
+    return generate_password_hash(password)
+
+
+def verify_password(stored: str, password: str) -> bool:
+    """Check a password against either an argon2 or a werkzeug-style hash."""
+    if not stored:
+        return False
+    if stored.startswith("$argon2"):
+        if _password_hasher is None:
+            return False
+        try:
+            return _password_hasher.verify(stored, password)
+        except Exception:
+            return False
+    return check_password_hash(stored, password)
+
 
 def manager_required(f):
     @wraps(f)
@@ -476,6 +571,53 @@ def inject_user_ctx():
 def _norm(s):
     return (s or "").strip().lower()
 
+
+def users_by_username(users: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Index user records by normalized username for O(1) lookups."""
+    return {_norm(u.get("username")): u for u in users if u.get("username")}
+
+
+_USERS_INDEX: Optional[tuple] = None
+
+
+def _user_display_names(users: List[Dict[str, Any]]) -> Dict[str, str]:
+    """username -> lowercased display name; reused while the list is unchanged.
+
+    Keyed on list identity like groups_by_id, so per-task assignment checks
+    within one request hit a dict instead of rescanning the user list.
+    """
+    global _USERS_INDEX
+    cached = _USERS_INDEX
+    if cached is not None and cached[0] is users:
+        return cached[1]
+    index = {
+        key: _norm(u.get("display_name"))
+        for key, u in users_by_username(users).items()
+    }
+    _USERS_INDEX = (users, index)
+    return index
+
+
+# Titles that make a member assignable from the task manager screens.
+ELIGIBLE_ASSIGNEE_TITLES = frozenset({
+    "assistant manager",
+    "family swim supervisor",
+    "lead supervisor",
+    "swim administrator",
+    "programming supervisor",
+    "supervisor",
+})
+
+
+def assignable_users(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Members holding an eligible title, shaped for the assignee dropdowns."""
+    return [
+        {"username": u["username"], "display_name": u.get("display_name") or u["username"].title()}
+        for u in users
+        if u.get("role") != "manager"
+        and any(t.lower() in ELIGIBLE_ASSIGNEE_TITLES for t in u.get("titles", []))
+    ]
+
 def normalize_tags(value: Any) -> list[str]:
     """Return a cleaned list of tag strings from form or stored data."""
     if not value:
@@ -533,9 +675,37 @@ def apply_task_defaults(task: Dict[str, Any]) -> Dict[str, Any]:
     task.setdefault("tags", [])
     task["tags"] = normalize_tags(task.get("tags"))
     task["recurring"] = normalize_recurring(task.get("recurring"))
+    # Pre-lowered assignment fields so visibility checks avoid per-task .lower()
+    task["assigned_to_lc"] = _norm(task.get("assigned_to"))
+    task["assigned_username_lc"] = _norm(task.get("assigned_username"))
+    # Due date parsed once at load time; filters treat None as "no/bad date".
+    task["_due"] = parse_date(task.get("due_date") or task.get("due"))
     return task
 
 
+def ensure_task_ids(tasks: List[Dict[str, Any]]) -> bool:
+    """Backfill stable UUIDs on tasks that predate id-based routing."""
+    changed = False
+    for task in tasks:
+        if not task.get("id"):
+            task["id"] = str(uuid.uuid4())
+            changed = True
+    return changed
+
+
+def find_task(tasks: List[Dict[str, Any]], task_id) -> tuple[Optional[int], Optional[Dict[str, Any]]]:
+    """Locate a task by its id, falling back to a positional index for legacy links."""
+    wanted = str(task_id)
+    for idx, task in enumerate(tasks):
+        if str(task.get("id")) == wanted:
+            return idx, task
+    if wanted.isdigit():
+        idx = int(wanted)
+        if 0 <= idx < len(tasks):
+            return idx, tasks[idx]
+    return None, None
+
+
 
 # ------------------------------- Badge persistence -------------------------------
 
@@ -698,29 +868,18 @@ def store_user_badge(username: str, badge_slug: str) -> Optional[Dict[str, Any]]
     return badge_dict
 
 
-def get_user_completion_stats(username: str, tasks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-    uname = _norm(username)
-    if not uname:
-        return {
-            "completed_tasks": [],
-            "completed_count": 0,
-            "completion_dates": [],
-            "unique_dates": [],
-            "longest_streak": 0,
-            "current_streak": 0,
-        }
-    task_list = tasks if tasks is not None else load_tasks()
-    completed_tasks: List[Dict[str, Any]] = []
-    for task in task_list:
-        if not isinstance(task, dict) or not task.get("done"):
-            continue
-        completed_by = _norm(task.get("completed_by"))
-        if not completed_by and task.get("assigned_username"):
-            completed_by = _norm(task.get("assigned_username"))
-        if completed_by != uname:
-            continue
-        completed_tasks.append(task)
+def empty_completion_stats() -> Dict[str, Any]:
+    return {
+        "completed_tasks": [],
+        "completed_count": 0,
+        "completion_dates": [],
+        "unique_dates": [],
+        "longest_streak": 0,
+        "current_streak": 0,
+    }
 
+
+def _completion_stats(completed_tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
     completion_dates: List[date] = []
     for task in completed_tasks:
         stamp = task.get("completed_at")
@@ -759,6 +918,70 @@ def get_user_completion_stats(username: str, tasks: Optional[List[Dict[str, Any]
     }
 
 
+def _task_completed_by(task: Any) -> str:
+    if not isinstance(task, dict) or not task.get("done"):
+        return ""
+    completed_by = _norm(task.get("completed_by"))
+    if not completed_by and task.get("assigned_username"):
+        completed_by = _norm(task.get("assigned_username"))
+    return completed_by
+
+
+def get_user_completion_stats(username: str, tasks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    uname = _norm(username)
+    if not uname:
+        return empty_completion_stats()
+    task_list = tasks if tasks is not None else load_tasks()
+    completed_tasks = [task for task in task_list if _task_completed_by(task) == uname]
+    return _completion_stats(completed_tasks)
+
+
+def compute_all_completion_stats(tasks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """Completion stats for every user in one pass over the task list.
+
+    Equivalent to calling get_user_completion_stats per user, but the task
+    list is only scanned once regardless of how many users there are.
+    """
+    task_list = tasks if tasks is not None else load_tasks()
+    buckets: Dict[str, List[Dict[str, Any]]] = {}
+    for task in task_list:
+        completed_by = _task_completed_by(task)
+        if completed_by:
+            buckets.setdefault(completed_by, []).append(task)
+    return {uname: _completion_stats(bucket) for uname, bucket in buckets.items()}
+
+
+def get_all_user_badges() -> Dict[str, List[Dict[str, Any]]]:
+    """Earned badges for every user from one read of the badge store."""
+    bootstrap_badges()
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    if DB_ENABLED and SessionLocal is not None:
+        with SessionLocal() as session:
+            rows = (
+                session.query(UserBadgeModel, BadgeModel)
+                .join(BadgeModel, UserBadgeModel.badge_id == BadgeModel.id)
+                .order_by(UserBadgeModel.earned_at)
+                .all()
+            )
+            for link, badge in rows:
+                badge_dict = _badge_to_dict(badge)
+                badge_dict["earned_at"] = iso_minutes(link.earned_at) if getattr(link, "earned_at", None) else None
+                results.setdefault(_norm(link.username), []).append(badge_dict)
+            return results
+    badge_catalog = get_badge_catalog()
+    for entry in load_user_badges_json():
+        uname = _norm(entry.get("username"))
+        badge = badge_catalog.get(entry.get("badge_slug"))
+        if not uname or not badge:
+            continue
+        badge_dict = dict(badge)
+        badge_dict["earned_at"] = entry.get("earned_at")
+        results.setdefault(uname, []).append(badge_dict)
+    for badges in results.values():
+        badges.sort(key=lambda item: item.get("earned_at") or "")
+    return results
+
+
 
 def get_next_badge_progress(stats: Dict[str, Any], earned_slugs: set[str], badge_catalog: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     for slug in BADGE_PROGRESS_ORDER:
@@ -875,7 +1098,11 @@ def parse_dt_any(s: str) -> datetime | None:
     text = s.strip()
     if not text:
         return None
+    return _parse_dt_cached(text)
+
 
+@lru_cache(maxsize=4096)
+def _parse_dt_cached(text: str) -> datetime | None:
     try:
         dt = datetime.fromisoformat(text)
     except ValueError:
@@ -901,11 +1128,23 @@ def iso_minutes(dt: datetime) -> str:
     return dt.replace(second=0, microsecond=0).isoformat(timespec="minutes")
 
 
+@lru_cache(maxsize=4096)
+def _parse_ymd(s: str) -> date:
+    # Manual slicing beats strptime/fromisoformat for the plain YYYY-MM-DD
+    # strings task due dates are stored as.
+    return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+
+
 def parse_date(date_str):
     """
     Parse just a DATE (YYYY-MM-DD) from a variety of inputs.
     Returns date or None.
     """
+    if isinstance(date_str, str) and len(date_str) == 10:
+        try:
+            return _parse_ymd(date_str)
+        except ValueError:
+            pass
     dt = parse_dt_any(date_str)
     return dt.date() if dt else None
 
@@ -919,6 +1158,17 @@ def parse_date_any(date_str, default_far=True):
         return datetime.combine(d, datetime.min.time())
     return datetime(9999, 12, 31) if default_far else datetime(1900, 1, 1)
 
+def request_users() -> List[Dict[str, Any]]:
+    """The users list, cached on flask.g so one request loads it at most once."""
+    if not has_request_context():
+        return load_users()
+    users = getattr(g, "_users", None)
+    if users is None:
+        users = load_users()
+        g._users = users
+    return users
+
+
 def assigned_to_me(task, username, users=None):
     """
     True if task assignment matches current user by:
@@ -926,18 +1176,23 @@ def assigned_to_me(task, username, users=None):
       - OR task['assigned_to'] equals user's display_name (legacy, case-insensitive)
     """
     if users is None:
-        users = load_users()
+        users = request_users()
 
-    task_username = _norm(task.get("assigned_username"))
-    if task_username and task_username == _norm(username):
+    me = _norm(username)
+
+    task_username = task.get("assigned_username_lc")
+    if task_username is None:
+        task_username = _norm(task.get("assigned_username"))
+    if task_username and task_username == me:
         return True
 
-    assignee_display = _norm(task.get("assigned_to"))
+    assignee_display = task.get("assigned_to_lc")
+    if assignee_display is None:
+        assignee_display = _norm(task.get("assigned_to"))
     if not assignee_display:
         return False
 
-    u = next((u for u in users if _norm(u.get("username")) == _norm(username)), None)
-    display_name = _norm(u.get("display_name")) if u else ""
+    display_name = _user_display_names(users).get(me, "")
     return bool(display_name and assignee_display == display_name)
 
 
@@ -947,7 +1202,7 @@ def task_owner(task) -> str:
 
 def task_visible_to(task, username, users=None):
     if users is None:
-        users = load_users()
+        users = request_users()
     uname = _norm(username)
     if not uname:
         return False
@@ -1040,17 +1295,22 @@ def _task_to_dict(model: "TaskModel") -> Dict[str, Any]:
 def load_tasks() -> List[Dict[str, Any]]:
     if not DB_ENABLED or SessionLocal is None:
         records = load_json(TASKS_FILE, [])
-        return [apply_task_defaults(dict(task)) for task in records]
-    with SessionLocal() as session:
-        rows = (
-            session.query(TaskModel)
-            .order_by(TaskModel.position, TaskModel.id)
-            .all()
-        )
-        if not rows:
-            records = load_json(TASKS_FILE, [])
-            return [apply_task_defaults(dict(task)) for task in records]
-        return [apply_task_defaults(_task_to_dict(row)) for row in rows]
+        tasks = [apply_task_defaults(dict(task)) for task in records]
+    else:
+        with SessionLocal() as session:
+            rows = (
+                session.query(TaskModel)
+                .order_by(TaskModel.position, TaskModel.id)
+                .all()
+            )
+            if not rows:
+                records = load_json(TASKS_FILE, [])
+                tasks = [apply_task_defaults(dict(task)) for task in records]
+            else:
+                tasks = [apply_task_defaults(_task_to_dict(row)) for row in rows]
+    if ensure_task_ids(tasks):
+        save_tasks(tasks)
+    return tasks
 
 
 def save_tasks(tasks: List[Dict[str, Any]]):
@@ -1062,6 +1322,10 @@ def save_tasks(tasks: List[Dict[str, Any]]):
         item = dict(record)
         item["tags"] = normalize_tags(item.get("tags"))
         item["recurring"] = normalize_recurring(item.get("recurring"))
+        # Derived at load time; no need to persist.
+        item.pop("assigned_to_lc", None)
+        item.pop("assigned_username_lc", None)
+        item.pop("_due", None)
         normalized.append(item)
 
     if not DB_ENABLED or SessionLocal is None:
@@ -1073,49 +1337,75 @@ def save_tasks(tasks: List[Dict[str, Any]]):
         session.flush()
         valid_usernames = {row.username for row in session.query(UserModel).all()}
         for idx, item in enumerate(normalized):
-            assigned_username = _optional_username(item.get("assigned_username"))
-            owner_username = _optional_username(item.get("owner") or item.get("created_by"))
-            completed_by_username = _optional_username(item.get("completed_by"))
-
-            if assigned_username and assigned_username not in valid_usernames:
-                assigned_username = None
-            if owner_username and owner_username not in valid_usernames:
-                owner_username = None
-            if completed_by_username and completed_by_username not in valid_usernames:
-                completed_by_username = None
-
-            due_date = parse_date(item.get("due_date")) if item.get("due_date") else None
-            created_at = parse_dt_any(item.get("created_at")) or datetime.utcnow()
-            completed_at = parse_dt_any(item.get("completed_at")) if item.get("completed_at") else None
-
-            priority = item.get("priority") or "Medium"
-            recurring = normalize_recurring(item.get("recurring"))
-            notes = item.get("notes") or None
-            assigned_display = item.get("assigned_to") or None
-            overdue = bool(item.get("overdue", False))
-            extra = {k: v for k, v in item.items() if k not in TASK_PERSISTED_KEYS}
-
-            if item.get("tags") is not None:
-                extra["tags"] = item.get("tags") or []
-
-            task = TaskModel(
-                text=item.get("text") or "",
-                done=bool(item.get("done", False)),
-                priority=priority,
-                notes=notes,
-                due_date=due_date,
-                recurring=recurring,
-                created_at=created_at,
-                completed_at=completed_at,
-                overdue=overdue,
-                assigned_username=assigned_username,
-                assigned_display=assigned_display,
-                owner_username=owner_username,
-                completed_by_username=completed_by_username,
-                position=idx,
-                extra=extra or None,
-            )
-            session.add(task)
+            session.add(_task_model_from_item(item, idx, valid_usernames))
+
+
+def _task_model_from_item(item: Dict[str, Any], position: int, valid_usernames: set) -> "TaskModel":
+    assigned_username = _optional_username(item.get("assigned_username"))
+    owner_username = _optional_username(item.get("owner") or item.get("created_by"))
+    completed_by_username = _optional_username(item.get("completed_by"))
+
+    if assigned_username and assigned_username not in valid_usernames:
+        assigned_username = None
+    if owner_username and owner_username not in valid_usernames:
+        owner_username = None
+    if completed_by_username and completed_by_username not in valid_usernames:
+        completed_by_username = None
+
+    due_date = parse_date(item.get("due_date")) if item.get("due_date") else None
+    created_at = parse_dt_any(item.get("created_at")) or datetime.utcnow()
+    completed_at = parse_dt_any(item.get("completed_at")) if item.get("completed_at") else None
+
+    priority = item.get("priority") or "Medium"
+    recurring = normalize_recurring(item.get("recurring"))
+    notes = item.get("notes") or None
+    assigned_display = item.get("assigned_to") or None
+    overdue = bool(item.get("overdue", False))
+    extra = {k: v for k, v in item.items() if k not in TASK_PERSISTED_KEYS}
+
+    if item.get("tags") is not None:
+        extra["tags"] = item.get("tags") or []
+
+    return TaskModel(
+        text=item.get("text") or "",
+        done=bool(item.get("done", False)),
+        priority=priority,
+        notes=notes,
+        due_date=due_date,
+        recurring=recurring,
+        created_at=created_at,
+        completed_at=completed_at,
+        overdue=overdue,
+        assigned_username=assigned_username,
+        assigned_display=assigned_display,
+        owner_username=owner_username,
+        completed_by_username=completed_by_username,
+        position=position,
+        extra=extra or None,
+    )
+
+
+def append_task(task: Dict[str, Any]) -> None:
+    """Persist one new task without rewriting the whole store.
+
+    With the database enabled this is a single-row insert instead of
+    save_tasks' delete-and-reinsert of every row. The JSON file is a single
+    array blob, so that path still goes through a full save.
+    """
+    if not DB_ENABLED or SessionLocal is None:
+        save_tasks(load_tasks() + [task])
+        return
+    item = dict(task)
+    item["tags"] = normalize_tags(item.get("tags"))
+    item["recurring"] = normalize_recurring(item.get("recurring"))
+    item.pop("assigned_to_lc", None)
+    item.pop("assigned_username_lc", None)
+    item.pop("_due", None)
+    with SessionLocal.begin() as session:
+        valid_usernames = {row.username for row in session.query(UserModel).all()}
+        position = session.query(TaskModel).count()
+        session.add(_task_model_from_item(item, position, valid_usernames))
+
 
 def load_users() -> List[Dict[str, Any]]:
     if not DB_ENABLED or SessionLocal is None:
@@ -1128,6 +1418,10 @@ def load_users() -> List[Dict[str, Any]]:
 
 
 def save_users(users: List[Dict[str, Any]]):
+    # Saving may have mutated a list _user_display_names cached by identity
+    # (settings_update edits display_name in place), so drop the index.
+    global _USERS_INDEX
+    _USERS_INDEX = None
     if not DB_ENABLED or SessionLocal is None:
         save_json(USERS_FILE, users)
         return
@@ -1256,11 +1550,16 @@ def _parse_time_components(value: str) -> tuple[int, int]:
     return hour, minute
 
 
+# Statuses an attendance entry may persist with; "clear" is an action, not a state.
+ATTENDANCE_STATUSES = frozenset({"attended", "missed"})
+_VALID_ATTENDANCE_ACTIONS = ATTENDANCE_STATUSES | {"clear"}
+
+
 def _normalize_attendance_status(value: Any) -> Optional[str]:
     if value is None:
         return None
     text = str(value).strip().lower()
-    if text in {"attended", "missed"}:
+    if text in ATTENDANCE_STATUSES:
         return text
     return None
 
@@ -1324,6 +1623,17 @@ def _shift_to_dict(model: "ShiftModel") -> Dict[str, Any]:
 
 
 def load_shifts() -> List[Dict[str, Any]]:
+    """Shift records, memoized on flask.g for the life of the request."""
+    if not has_request_context():
+        return _load_shifts_uncached()
+    shifts = getattr(g, "_shifts", None)
+    if shifts is None:
+        shifts = _load_shifts_uncached()
+        g._shifts = shifts
+    return shifts
+
+
+def _load_shifts_uncached() -> List[Dict[str, Any]]:
     if DB_ENABLED and SessionLocal is not None:
         with SessionLocal() as session:
             rows = (
@@ -1351,9 +1661,27 @@ def save_shifts(shifts: List[Dict[str, Any]]) -> None:
         raise RuntimeError("save_shifts is only supported with the JSON storage backend.")
     normalized = [apply_shift_defaults(record) for record in shifts or []]
     save_json(SHIFTS_FILE, normalized)
+    if has_request_context():
+        g.pop("_shifts", None)
+
+
+def shifts_by_id(shifts: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Index shifts by stringified id for O(1) lookups."""
+    return {str(record.get("id")): record for record in shifts}
 
 
 def load_shift_attendance_store() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Attendance store, memoized on flask.g for the life of the request."""
+    if not has_request_context():
+        return _load_shift_attendance_uncached()
+    store = getattr(g, "_shift_attendance", None)
+    if store is None:
+        store = _load_shift_attendance_uncached()
+        g._shift_attendance = store
+    return store
+
+
+def _load_shift_attendance_uncached() -> Dict[str, Dict[str, Dict[str, Any]]]:
     raw = load_json(SHIFT_ATTENDANCE_FILE, {})
     store: Dict[str, Dict[str, Dict[str, Any]]] = {}
     if not isinstance(raw, dict):
@@ -1403,6 +1731,8 @@ def save_shift_attendance_store(store: Dict[str, Dict[str, Dict[str, Any]]]) ->
         if cleaned:
             serializable[normalized_user] = cleaned
     save_json(SHIFT_ATTENDANCE_FILE, serializable)
+    if has_request_context():
+        g.pop("_shift_attendance", None)
 
 
 def load_shifts_for_user(username: str) -> List[Dict[str, Any]]:
@@ -1617,63 +1947,271 @@ def update_shift_attendance(username: str, shift_id: str, status: str | None) ->
         raise ValueError("Attendance status is required.")
 
     action = str(status).strip().lower()
-    normalized_status = None if action == "clear" else _normalize_attendance_status(action)
-    if action != "clear" and not normalized_status:
+    if action not in _VALID_ATTENDANCE_ACTIONS:
         raise ValueError("Invalid attendance status.")
+    if action == "clear":
+        # Clearing never needs the shift list: removing a key that is not
+        # there is a no-op, so skip the load/validate round-trip entirely.
+        store = load_shift_attendance_store()
+        # Don't allocate a per-user sub-dict just to clear from it.
+        user_map = store.get(uname)
+        if user_map is not None:
+            user_map.pop(str(shift_id), None)
+            if not user_map:
+                store.pop(uname, None)
+        save_shift_attendance_store(store)
+        return None
 
-    target: Optional[dict[str, Any]] = None
-    for record in load_shifts():
-        if _norm(record.get("assigned_to")) != uname:
-            continue
-        if str(record.get("id")) == str(shift_id):
-            target = record
-            break
-    if target is None:
+    target = shifts_by_id(load_shifts()).get(str(shift_id))
+    if target is None or _norm(target.get("assigned_to")) != uname:
         raise ShiftNotFoundError("Shift not found.")
 
     store = load_shift_attendance_store()
-    user_map = store.setdefault(uname, {})
     shift_key = str(target.get("id"))
 
-    if normalized_status is None:
-        user_map.pop(shift_key, None)
-        if not user_map:
-            store.pop(uname, None)
-        save_shift_attendance_store(store)
-        return None
-
     entry = {
-        "status": normalized_status,
+        "status": action,
         "recorded_at": iso_minutes(datetime.utcnow()),
     }
-    user_map[shift_key] = entry
+    store.setdefault(uname, {})[shift_key] = entry
     save_shift_attendance_store(store)
     return entry
 
 
-def load_titles():            return load_json(TITLES_FILE, [])
-def save_titles(t):           save_json(TITLES_FILE, t)
+def load_doc(key: str, path: str, default):
+    """Load a JSON-ish document from the database, falling back to its legacy file."""
+    if not DB_ENABLED or SessionLocal is None:
+        return load_json(path, default)
+    with SessionLocal() as session:
+        row = session.get(JsonDocModel, key)
+        if row is None:
+            return load_json(path, default)
+        return row.data
+
+
+def save_doc(key: str, path: str, data) -> None:
+    """Persist a document as a single-row upsert instead of rewriting a whole file."""
+    if not DB_ENABLED or SessionLocal is None:
+        save_json(path, data)
+        return
+    with SessionLocal.begin() as session:
+        row = session.get(JsonDocModel, key)
+        if row is None:
+            session.add(JsonDocModel(key=key, data=data))
+        else:
+            row.data = data
+
+
+def load_titles():            return load_doc("titles", TITLES_FILE, [])
+def save_titles(t):           save_doc("titles", TITLES_FILE, t)
+
+def load_groups():            return load_doc("groups", GROUPS_FILE, [])
+
+
+def save_groups(g):
+    # Strip in-memory helper keys (e.g. the cached member set) before writing.
+    cleaned = [{k: v for k, v in grp.items() if not k.startswith("_")} for grp in g]
+    save_doc("groups", GROUPS_FILE, cleaned)
+
+
+_GROUPS_INDEX: Optional[tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]] = None
+
+
+def groups_by_id(groups: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Index groups by id; reuses the index while the cached list is unchanged."""
+    global _GROUPS_INDEX
+    cached = _GROUPS_INDEX
+    if cached is not None and cached[0] is groups:
+        return cached[1]
+    index = {g["id"]: g for g in groups}
+    _GROUPS_INDEX = (groups, index)
+    return index
+
+
+def get_group(group_id: str, groups: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+    if groups is None:
+        groups = load_groups()
+    return groups_by_id(groups).get(group_id)
+
+
+def group_members(group: Dict[str, Any]) -> frozenset:
+    """Cached frozenset of a group's members for O(1) auth checks."""
+    members = group.get("members") or []
+    cached = group.get("_members_set")
+    if cached is None or len(cached) != len(members):
+        cached = frozenset(members)
+        group["_members_set"] = cached
+    return cached
+
+def load_group_tasks():       return load_doc("group_tasks", GROUP_TASKS_FILE, {})
+def save_group_tasks(g):      save_doc("group_tasks", GROUP_TASKS_FILE, g)
+
+# Group messages live in append-only NDJSON logs, one file per group, so a
+# post costs one line of I/O instead of rewriting every group's history.
+# The legacy single-blob store is still read for groups without a log yet.
+
+
+def _group_message_log(gid: str) -> str:
+    return os.path.join(GROUP_MESSAGES_DIR, f"{gid}.ndjson")
+
+
+def _dump_message_line(message: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(message) + b"\n"
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _read_message_log(path: str) -> Optional[List[Dict[str, Any]]]:
+    try:
+        with open(path, "rb", buffering=0) as f:
+            raw = f.read()
+    except OSError:
+        return None
+    loads = orjson.loads if orjson is not None else json.loads
+    messages = []
+    for line in raw.splitlines():
+        if not line:
+            continue
+        try:
+            messages.append(loads(line))
+        except ValueError:
+            # A torn or corrupt line must not 500 every view of the group;
+            # skip it, like load_json falls back on an unparseable store.
+            continue
+    return messages
+
+
+def _legacy_group_messages() -> Dict[str, List[Dict[str, Any]]]:
+    return load_doc("group_messages", GROUP_MESSAGES_FILE, {})
+
+
+def load_group_messages_for(gid: str) -> List[Dict[str, Any]]:
+    msgs = _read_message_log(_group_message_log(gid))
+    if msgs is not None:
+        return msgs
+    return _legacy_group_messages().get(gid, [])
+
+
+def save_group_messages_for(gid: str, msgs: List[Dict[str, Any]]) -> None:
+    os.makedirs(GROUP_MESSAGES_DIR, exist_ok=True)
+    path = _group_message_log(gid)
+    with with_json_lock(path):
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=GROUP_MESSAGES_DIR)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                # One join + one write instead of a write per message line.
+                f.write(b"".join(_dump_message_line(m) for m in msgs))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        finally:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def append_group_message(gid: str, message: Dict[str, Any]) -> None:
+    path = _group_message_log(gid)
+    if not os.path.exists(path):
+        # First append migrates this group's legacy history into its log.
+        save_group_messages_for(gid, load_group_messages_for(gid) + [message])
+        return
+    with with_json_lock(path):
+        with open(path, "ab") as f:
+            f.write(_dump_message_line(message))
+
+
+def load_group_messages() -> Dict[str, List[Dict[str, Any]]]:
+    merged = dict(_legacy_group_messages())
+    try:
+        names = os.listdir(GROUP_MESSAGES_DIR)
+    except OSError:
+        names = []
+    for name in names:
+        if name.endswith(".ndjson"):
+            msgs = _read_message_log(os.path.join(GROUP_MESSAGES_DIR, name))
+            if msgs is not None:
+                merged[name[:-len(".ndjson")]] = msgs
+    return merged
+
+
+def save_group_messages(m):
+    for gid, msgs in (m or {}).items():
+        save_group_messages_for(gid, msgs)
 
-def load_groups():            return load_json(GROUPS_FILE, [])
-def save_groups(g):           save_json(GROUPS_FILE, g)
+def load_group_seen():
+    pending = _group_seen_pending
+    if pending is not None:
+        return pending
+    return load_doc("group_seen", GROUP_SEEN_FILE, {})
 
-def load_group_tasks():       return load_json(GROUP_TASKS_FILE, {})
-def save_group_tasks(g):      save_json(GROUP_TASKS_FILE, g)
 
-def load_group_messages():    return load_json(GROUP_MESSAGES_FILE, {})
-def save_group_messages(m):   save_json(GROUP_MESSAGES_FILE, m)
+def save_group_seen(d):       save_doc("group_seen", GROUP_SEEN_FILE, d)
 
-def load_group_seen():        return load_json(GROUP_SEEN_FILE, {})
-def save_group_seen(d):       save_json(GROUP_SEEN_FILE, d)
 
-def load_reminders():         return load_json(REMINDERS_FILE, [])
-def save_reminders(items):    save_json(REMINDERS_FILE, items)
+# Seen-marker updates are pure bookkeeping, so page views queue them and a
+# short timer flushes one write instead of rewriting the store per view.
+GROUP_SEEN_FLUSH_DELAY = 2.0
 
-def load_prefs():             return load_json(PREFERENCES_FILE, {})
-def save_prefs(p):            save_json(PREFERENCES_FILE, p)
+_group_seen_lock = threading.Lock()
+_group_seen_pending: Optional[Dict[str, Any]] = None
+_group_seen_timer: Optional[threading.Timer] = None
 
-def load_resets():            return load_json(PASSWORD_RESETS_FILE, {})
-def save_resets(data):        save_json(PASSWORD_RESETS_FILE, data)
+
+def _flush_group_seen():
+    global _group_seen_pending, _group_seen_timer
+    with _group_seen_lock:
+        pending = _group_seen_pending
+        _group_seen_pending = None
+        _group_seen_timer = None
+        if pending is not None:
+            # Request threads keep mutating the live dict handed out by
+            # load_group_seen, so snapshot it under the lock; serializing the
+            # live object could race a concurrent write and drop the update.
+            pending = {user: dict(groups) for user, groups in pending.items()}
+    if pending is not None:
+        save_group_seen(pending)
+
+
+def save_group_seen_deferred(seen_map: Dict[str, Any]) -> None:
+    global _group_seen_pending, _group_seen_timer
+    with _group_seen_lock:
+        _group_seen_pending = seen_map
+        if _group_seen_timer is None:
+            _group_seen_timer = threading.Timer(GROUP_SEEN_FLUSH_DELAY, _flush_group_seen)
+            _group_seen_timer.daemon = True
+            _group_seen_timer.start()
+
+
+atexit.register(_flush_group_seen)
+
+def load_reminders():         return load_doc("reminders", REMINDERS_FILE, [])
+def save_reminders(items):    save_doc("reminders", REMINDERS_FILE, items)
+
+def load_prefs():             return load_doc("preferences", PREFERENCES_FILE, {})
+def save_prefs(p):            save_doc("preferences", PREFERENCES_FILE, p)
+
+def load_resets():            return load_doc("password_resets", PASSWORD_RESETS_FILE, {})
+def save_resets(data):        save_doc("password_resets", PASSWORD_RESETS_FILE, data)
+
+
+# Per-group timestamp lists for unread counts. Messages are append-only and
+# already timestamp-ordered, so the list is reusable until the group grows.
+_GROUP_TS_CACHE: Dict[str, List[str]] = {}
+
+
+def _group_timestamps(gid: str, msgs: List[Dict[str, Any]]) -> List[str]:
+    ts = _GROUP_TS_CACHE.get(gid)
+    if ts is None or len(ts) != len(msgs) or (ts and ts[-1] != msgs[-1].get("timestamp", "")):
+        ts = [m.get("timestamp", "") for m in msgs]
+        _GROUP_TS_CACHE[gid] = ts
+    return ts
+
+
+def unread_message_count(gid: str, msgs: List[Dict[str, Any]], last_seen: str) -> int:
+    ts = _group_timestamps(gid, msgs)
+    return len(ts) - bisect.bisect_right(ts, last_seen)
 
 
 
@@ -1717,8 +2255,8 @@ def seed_demo_data():
     admin_pw_source = os.getenv("DEMO_ADMIN_PASSWORD") or secrets.token_urlsafe(24)
     member_pw_source = os.getenv("DEMO_MEMBER_PASSWORD") or secrets.token_urlsafe(24)
 
-    admin_pw = generate_password_hash(admin_pw_source)
-    member_pw = generate_password_hash(member_pw_source)
+    admin_pw = hash_password(admin_pw_source)
+    member_pw = hash_password(member_pw_source)
 
     demo_users = [
         {
@@ -1831,12 +2369,8 @@ def healthz():
     return {"ok": True, "mode": APP_MODE}, 200
 
 # ------------------------------- Jinja filters -------------------------------
-@app.template_filter('format_datetime')
-def format_datetime(value):
-    """Accept ISO 'YYYY-MM-DDTHH:MM' or 12h 'YYYY-MM-DDT%I:%M %p' and format nicely."""
-    if not value:
-        return ""
-    dt = None
+@lru_cache(maxsize=2048)
+def _format_datetime_cached(value):
     try:
         dt = datetime.fromisoformat(value)
     except Exception:
@@ -1846,6 +2380,14 @@ def format_datetime(value):
             return value
     return dt.strftime("%b %d, %Y %I:%M %p")
 
+
+@app.template_filter('format_datetime')
+def format_datetime(value):
+    """Accept ISO 'YYYY-MM-DDTHH:MM' or 12h 'YYYY-MM-DDT%I:%M %p' and format nicely."""
+    if not value:
+        return ""
+    return _format_datetime_cached(value)
+
 # ------------------------------- Auth -------------------------------
 @app.route("/signup", methods=["GET","POST"])
 @demo_guard
@@ -1860,7 +2402,7 @@ def signup():
         users.append({
             "username": uname,
             "display_name": raw.title(),
-            "password": generate_password_hash(request.form["password"]),
+            "password": hash_password(request.form["password"]),
             "role": "member",
             "titles": [],
             "join_date": datetime.utcnow().isoformat(timespec="seconds"),
@@ -1878,7 +2420,7 @@ def login():
         uname = request.form["username"].strip().lower()
         pwd = request.form["password"]
         record = find_user_record(uname)
-        if record and check_password_hash(record["password"], pwd):
+        if record and verify_password(record["password"], pwd):
             login_user(AppUser.from_record(record))
             flash("Logged in.", "success")
             return redirect(url_for("index"))
@@ -1965,7 +2507,7 @@ def reset_password(token):
         target_username = record["username"]
         for user in users:
             if _norm(user.get("username")) == _norm(target_username):
-                user["password"] = generate_password_hash(pw1)
+                user["password"] = hash_password(pw1)
                 break
         save_users(users)
 
@@ -1992,17 +2534,23 @@ def index():
     # tasks
     tasks_all = load_tasks()
     for t in tasks_all:
-        d = t.get("due") or t.get("due_date")
-        due_d = parse_date(d)
-        t["overdue"]   = (due_d is not None) and (not t.get("done", False)) and (due_d < today)
-        t["due_today"] = (due_d is not None) and (not t.get("done", False)) and (due_d == today)
+        due_d = t.get("_due")
+        if due_d is None or t.get("done", False):
+            t["overdue"] = t["due_today"] = False
+        else:
+            t["overdue"] = due_d < today
+            t["due_today"] = due_d == today
 
     # visible tasks
     visible = tasks_all if role == "manager" else [
         t for t in tasks_all if task_visible_to(t, username, users)
     ]
 
-    assignees = sorted({t.get("assigned_to") for t in tasks_all if t.get("assigned_to")})
+    # Only managers get the assignee filter UI; skip the scan for members.
+    if role == "manager":
+        assignees = sorted(dict.fromkeys(t["assigned_to"] for t in tasks_all if t.get("assigned_to")))
+    else:
+        assignees = []
 
     # group cards (latest + unread)
     groups = load_groups()
@@ -2010,24 +2558,24 @@ def index():
     seen_map_all = load_group_seen()
     user_seen = seen_map_all.get(username, {})
 
-    my_groups = groups if role == "manager" else [g for g in groups if username in g.get("members", [])]
+    my_groups = groups if role == "manager" else [g for g in groups if username in group_members(g)]
     group_cards = []
     for g in my_groups:
         gid = g["id"]
         msgs = messages_by_group.get(gid, [])
         last_msg = msgs[-1] if msgs else None
         last_seen = user_seen.get(gid, "1970-01-01T00:00")
-        unread = sum(1 for m in msgs if m.get("timestamp","") > last_seen)
+        unread = unread_message_count(gid, msgs, last_seen)
         sender_display = uname_to_disp.get(last_msg["sender"], last_msg["sender"].title()) if last_msg else None
         group_cards.append({
             "id": gid,
             "name": g["name"],
             "unread": unread,
             "last": last_msg,
-            "last_sender_display": sender_display
+            "last_sender_display": sender_display,
+            "_ts": last_msg["timestamp"] if last_msg else ""
         })
-    def _last_ts(gc): return gc["last"]["timestamp"] if gc["last"] else ""
-    group_cards.sort(key=lambda gc: (_last_ts(gc), gc["unread"]), reverse=True)
+    group_cards.sort(key=itemgetter("_ts", "unread"), reverse=True)
 
     # reminders for current user
     all_rem = load_reminders()
@@ -2130,7 +2678,7 @@ def search():
     # groups (respect membership)
     groups = load_groups()
     if role != "manager":
-        groups = [g for g in groups if user in g.get("members", [])]
+        groups = [g for g in groups if user in group_members(g)]
     groups_by_id = {g["id"]: g for g in groups}
 
     # group messages
@@ -2227,7 +2775,7 @@ def add():
     created_by = require_username()
 
     users = load_users()
-    assignee_user = next((u for u in users if _norm(u["username"]) == assignee_key), None)
+    assignee_user = users_by_username(users).get(assignee_key)
     if assignee_user:
         assigned_display = assignee_user.get("display_name") or assignee_user["username"].title()
         assigned_username = _norm(assignee_user["username"])
@@ -2238,7 +2786,25 @@ def add():
         assigned_display = ""
         assigned_username = None
 
+    # O(1) duplicate check against open tasks: same text, assignee, and due
+    # date. Unassigned tasks are visible only to their creator, so they fall
+    # back to deduping on created_by instead of colliding across members.
+    fingerprint = (_norm(text), _norm(assigned_username) or _norm(created_by), due_date)
+    open_fingerprints = {
+        (
+            _norm(t.get("text")),
+            _norm(t.get("assigned_username")) or _norm(t.get("created_by") or t.get("owner")),
+            t.get("due_date") or "",
+        )
+        for t in load_tasks()
+        if not t.get("done")
+    }
+    if fingerprint in open_fingerprints:
+        flash("An identical open task already exists.", "warning")
+        return redirect(url_for("tasks_page" if current_role()=="manager" else "index"))
+
     new = {
+        "id": str(uuid.uuid4()),
         "text": text,
         "done": False,
         "priority": priority,
@@ -2252,13 +2818,11 @@ def add():
         "created_by": created_by,
         "created_at": datetime.now().isoformat(timespec="minutes")
     }
-    ts = load_tasks()
-    ts.append(new)
-    save_tasks(ts)
+    append_task(new)
     flash("Task added.", "success")
     return redirect(url_for("tasks_page" if current_role()=="manager" else "index"))
 
-@app.route("/toggle/<int:task_id>", methods=["POST"])
+@app.route("/toggle/<task_id>", methods=["POST"])
 @login_required
 @demo_guard
 def toggle(task_id):
@@ -2267,8 +2831,8 @@ def toggle(task_id):
     users = load_users()
     ts = load_tasks()
     newly_awarded: List[Dict[str, Any]] = []
-    if 0 <= task_id < len(ts):
-        t = ts[task_id]
+    _, t = find_task(ts, task_id)
+    if t is not None:
         if role == "manager" or task_visible_to(t, username, users):
             t["done"] = not t.get("done", False)
             if t["done"]:
@@ -2283,6 +2847,7 @@ def toggle(task_id):
                         new_task = dict(t)
                         for key in ("completed_at", "completed_by"):
                             new_task.pop(key, None)
+                        new_task["id"] = str(uuid.uuid4())
                         new_task["done"] = False
                         new_task["overdue"] = False
                         new_task["created_at"] = iso_minutes(now)
@@ -2302,24 +2867,24 @@ def toggle(task_id):
     flash("Task status updated.", "success")
     return redirect(url_for("tasks_page" if role == "manager" else "index"))
 
-@app.route("/remove/<int:task_id>")
+@app.route("/remove/<task_id>")
 @login_required
 def remove(task_id):
     username = require_username()
     role = current_role()
     users = load_users()
     ts = load_tasks()
-    if 0<=task_id<len(ts):
-        t = ts[task_id]
+    idx, t = find_task(ts, task_id)
+    if t is not None:
         if role=="manager" or task_visible_to(t, username, users):
-            ts.pop(task_id)
+            ts.pop(idx)
             save_tasks(ts)
             flash("Task removed.", "info")
         else:
             flash("Not authorized to remove this task.", "danger")
     return redirect(url_for("tasks_page" if role=="manager" else "index"))
 
-@app.route("/edit/<int:task_id>", methods=["GET","POST"])
+@app.route("/edit/<task_id>", methods=["GET","POST"])
 @login_required
 @demo_guard
 def edit(task_id):
@@ -2329,15 +2894,15 @@ def edit(task_id):
     ts = load_tasks()
 
     if request.method=="POST":
-        if 0<=task_id<len(ts):
-            t = ts[task_id]
+        _, t = find_task(ts, task_id)
+        if t is not None:
             if role=="manager" or task_visible_to(t, username, users):
                 t["text"] = request.form.get("task","").strip() or t.get("text","")
                 t["priority"] = request.form.get("priority","Medium")
                 if role=="manager":
                     assignee_raw = request.form.get("assigned_to","").strip()
                     assignee_key = _norm(assignee_raw)
-                    assignee_user = next((u for u in users if _norm(u["username"]) == assignee_key), None)
+                    assignee_user = users_by_username(users).get(assignee_key)
                     if assignee_user:
                         t["assigned_to"] = assignee_user.get("display_name") or assignee_user["username"].title()
                         t["assigned_username"] = _norm(assignee_user["username"])
@@ -2356,8 +2921,8 @@ def edit(task_id):
                 flash("Task updated.", "success")
         return redirect(url_for("tasks_page" if role=="manager" else "index"))
     else:
-        if 0<=task_id<len(ts):
-            t = ts[task_id]
+        _, t = find_task(ts, task_id)
+        if t is not None:
             if role=="manager" or task_visible_to(t, username, users):
                 assignable = [
                     {"username": u["username"], "display_name": u.get("display_name") or u["username"].title()}
@@ -2368,6 +2933,20 @@ def edit(task_id):
                 return render_template("edit.html", task=t, task_id=task_id, assignable_users=assignable, role=role)
     return redirect(url_for("tasks_page" if role=="manager" else "index"))
 
+_PRIORITY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+# sort key -> (key factory taking the per-request due map, reverse flag);
+# dispatch table instead of an elif chain so new sorts are one entry.
+TASK_SORTS = {
+    "due_asc": (lambda due: lambda t: due[id(t)] or date.max, False),
+    "due_desc": (lambda due: lambda t: due[id(t)] or date.max, True),
+    "priority_hl": (lambda due: lambda t: _PRIORITY_RANK.get(t.get("priority"), len(_PRIORITY_RANK)), False),
+    "priority_lh": (lambda due: lambda t: _PRIORITY_RANK.get(t.get("priority"), len(_PRIORITY_RANK)), True),
+    "created_desc": (lambda due: lambda t: parse_dt_any(t.get("created_at")) or datetime.min, True),
+    "completed": (lambda due: lambda t: parse_dt_any(t.get("completed_at")) or datetime.min, True),
+}
+
+
 @app.route("/tasks", endpoint="task_manager")
 @manager_required
 def tasks_page():
@@ -2394,10 +2973,11 @@ def tasks_page():
     today_val = date.today()
 
     filtered: List[Dict[str, Any]] = []
+    due_by_task: Dict[int, Optional[date]] = {}
     for task in all_tasks:
         tags_lower = [tag.lower() for tag in task.get("tags", [])]
-        due_ref = task.get("due_date") or task.get("due")
-        due_dt = parse_date(due_ref) if due_ref else None
+        due_dt = task.get("_due")
+        due_by_task[id(task)] = due_dt
 
         if selected_priorities and task.get("priority") not in selected_priorities:
             continue
@@ -2427,33 +3007,16 @@ def tasks_page():
 
         filtered.append(task)
 
-    valid_sorts = {"due_asc", "due_desc", "priority_hl", "priority_lh", "completed", "created_desc"}
-    if sort_by not in valid_sorts:
+    if sort_by not in TASK_SORTS:
         sort_by = "due_asc"
 
-    priority_rank = {"High": 0, "Medium": 1, "Low": 2}
-
     if sort_by == "completed":
         filtered = [task for task in filtered if task.get("done")]
-        filtered.sort(key=lambda t: parse_dt_any(t.get("completed_at")) or datetime.min, reverse=True)
-    elif sort_by == "priority_hl":
-        filtered.sort(key=lambda t: priority_rank.get(t.get("priority"), len(priority_rank)))
-    elif sort_by == "priority_lh":
-        filtered.sort(key=lambda t: priority_rank.get(t.get("priority"), len(priority_rank)), reverse=True)
-    elif sort_by == "due_desc":
-        filtered.sort(key=lambda t: parse_date_any(t.get("due") or t.get("due_date"), default_far=True), reverse=True)
-    elif sort_by == "created_desc":
-        filtered.sort(key=lambda t: parse_dt_any(t.get("created_at")) or datetime.min, reverse=True)
-    else:
-        filtered.sort(key=lambda t: parse_date_any(t.get("due") or t.get("due_date"), default_far=True))
+    key_factory, reverse = TASK_SORTS[sort_by]
+    filtered.sort(key=key_factory(due_by_task), reverse=reverse)
 
     users = load_users()
-    elig = {"assistant manager", "family swim supervisor", "lead supervisor", "swim administrator", "programming supervisor", "supervisor"}
-    assignable = [
-        {"username": u["username"], "display_name": u.get("display_name") or u["username"].title()}
-        for u in users
-        if u["role"] != "manager" and any(t.lower() in elig for t in u.get("titles", []))
-    ]
+    assignable = assignable_users(users)
 
     all_tags = sorted({tag for task in all_tasks for tag in normalize_tags(task.get("tags"))})
 
@@ -2478,12 +3041,7 @@ def create_task_page():
     if request.method=="POST":
         return redirect(url_for("add"))
     users = load_users()
-    elig = {"assistant manager","family swim supervisor","lead supervisor","swim administrator","programming supervisor","supervisor"}
-    assignable = [
-        {"username": u["username"], "display_name": u.get("display_name") or u["username"].title()}
-        for u in users
-        if u["role"]!="manager" and any(t.lower() in elig for t in u.get("titles",[]))
-    ]
+    assignable = assignable_users(users)
     set_breadcrumbs(("Home", url_for("dashboard")), ("Tasks", url_for("tasks_page")), ("Create Task", None))
     return render_template("create_task.html", assignable_users=assignable, all_tags=sorted({tag for task in load_tasks() for tag in normalize_tags(task.get("tags"))}))
 
@@ -2804,7 +3362,7 @@ def calendar_feed():
         start_value = due_dt.isoformat() if not all_day else due_dt.date().isoformat()
 
         events.append({
-            "id": f"task-{idx}",
+            "id": f"task-{task.get('id', idx)}",
             "title": title,
             "start": start_value,
             "allDay": all_day,
@@ -2816,7 +3374,7 @@ def calendar_feed():
             "durationEditable": False,
             "extendedProps": {
                 "type": "task",
-                "task_id": idx,
+                "task_id": task.get("id", idx),
                 "status": status,
                 "done": done,
                 "priority": task.get("priority") or "Medium",
@@ -2826,7 +3384,7 @@ def calendar_feed():
                 "due_raw": due_raw,
                 "completed_at": task.get("completed_at"),
                 "recurring": recurring,
-                "edit_url": url_for("edit", task_id=idx),
+                "edit_url": url_for("edit", task_id=task.get("id", idx)),
             },
         })
 
@@ -2866,18 +3424,17 @@ def calendar_feed():
 
     return jsonify(events)
 
-@app.route("/api/tasks/<int:task_id>/due", methods=["PATCH"])
+@app.route("/api/tasks/<task_id>/due", methods=["PATCH"])
 @login_required
 @demo_guard
-def update_task_due_date(task_id: int):
+def update_task_due_date(task_id: str):
     username = require_username()
     role = current_role()
     tasks = load_tasks()
 
-    if not (0 <= task_id < len(tasks)):
+    _, task = find_task(tasks, task_id)
+    if task is None:
         return jsonify({"error": "Task not found"}), 404
-
-    task = tasks[task_id]
     users = load_users()
     if role != "manager" and not task_visible_to(task, username, users):
         return jsonify({"error": "Not authorized"}), 403
@@ -2910,6 +3467,9 @@ def update_task_due_date(task_id: int):
     return jsonify({"ok": True, "due_date": new_due})
 
 
+TASK_EVENT_COLORS = {"High": "#f66", "Medium": "#fa6", "Low": "#6a6"}
+
+
 # Legacy (tasks only) - kept for backward compatibility
 @app.route("/api/tasks/events")
 @login_required
@@ -2919,18 +3479,19 @@ def task_events():
         start_date = t.get("due") or t.get("due_date")
         if start_date:
             pr = t.get("priority","Medium")
-            color_map = {"High":"#f66","Medium":"#fa6","Low":"#6a6"}
             evts.append({
-                "id": i,
+                "id": t.get("id", i),
                 "title": f"{t.get('text','Task')} ({pr})",
                 "start": start_date,
-                "color": color_map.get(pr, "#6a6"),
+                "color": TASK_EVENT_COLORS.get(pr, "#6a6"),
                 "extendedProps": {
                     "assigned_to":t.get("assigned_to",""),
                     "notes":t.get("notes",""),
                     "done":t.get("done",False)
                 }
             })
+    if orjson is not None:
+        return app.response_class(orjson.dumps(evts), mimetype="application/json")
     return jsonify(evts)
 
 # ------------------------------- Settings -------------------------------
@@ -2951,7 +3512,7 @@ def settings():
 
     # load the user's current display name
     users = load_users()
-    urec = next((u for u in users if u["username"] == user), None)
+    urec = users_by_username(users).get(_norm(user))
     effective_display = (urec.get("display_name") if urec and urec.get("display_name")
                          else user.title())
 
@@ -3203,31 +3764,31 @@ def overdue_tasks():
     today = date.today()
     set_breadcrumbs(("Home", url_for("dashboard")), ("Overdue Tasks", None))
 
-    users = load_users()
     tasks = load_tasks()
 
-    overdue_entries = []
-    for idx, task in enumerate(tasks):
-        if task.get("done"):
-            continue
-
-        if role != "manager" and not task_visible_to(task, username, users):
-            continue
-
-        due_raw = task.get("due") or task.get("due_date") or ""
-        due_dt = parse_dt_any(due_raw)
-        if not due_dt:
-            continue
-
-        if due_dt.date() >= today:
-            continue
+    # Managers see every task, so their path is a pure date filter with no
+    # per-task visibility lookup (and no users load at all).
+    if role == "manager":
+        candidates = ((idx, task) for idx, task in enumerate(tasks) if not task.get("done"))
+    else:
+        users = request_users()
+        candidates = (
+            (idx, task)
+            for idx, task in enumerate(tasks)
+            if not task.get("done") and task_visible_to(task, username, users)
+        )
 
-        overdue_entries.append({
-            "idx": idx,
+    overdue_entries = [
+        {
+            "idx": task.get("id", idx),
             "task": task,
             "due_dt": due_dt,
             "due_display": due_dt.strftime("%b %d, %Y"),
-        })
+        }
+        for idx, task in candidates
+        if (due_dt := parse_dt_any(task.get("due") or task.get("due_date") or "")) is not None
+        and due_dt.date() < today
+    ]
 
     overdue_entries.sort(key=lambda item: item["due_dt"])
 
@@ -3287,23 +3848,23 @@ def chats():
     msgs_by_group = load_group_messages()
     seen_map = load_group_seen().get(user, {})
 
-    my_groups = [g for g in groups if user in g.get("members", [])]
+    my_groups = [g for g in groups if user in group_members(g)]
     cards = []
     for g in my_groups:
         gid = g["id"]
         lst = msgs_by_group.get(gid, [])
         last_msg = lst[-1] if lst else None
         last_seen = seen_map.get(gid, "1970-01-01T00:00")
-        unread = sum(1 for m in lst if m.get("timestamp","") > last_seen)
+        unread = unread_message_count(gid, lst, last_seen)
         cards.append({
             "id": gid,
             "name": g.get("name", "Group"),
             "unread": unread,
-            "last": last_msg
+            "last": last_msg,
+            "_ts": last_msg["timestamp"] if last_msg else ""
         })
 
-    def _ts(c): return c["last"]["timestamp"] if c["last"] else ""
-    cards.sort(key=lambda c: (_ts(c), c["unread"]), reverse=True)
+    cards.sort(key=itemgetter("_ts", "unread"), reverse=True)
 
     set_breadcrumbs(("Home", url_for("dashboard")), ("Group Chats", None))
     return render_template("my_chats.html", cards=cards)
@@ -3314,13 +3875,13 @@ def view_group(group_id):
     user = require_username()
     role = current_role()
     gs   = load_groups()
-    grp  = next((g for g in gs if g["id"]==group_id), None)
-    if not grp or (role!="manager" and user not in grp.get("members",[])):
+    grp  = get_group(group_id, gs)
+    if not grp or (role!="manager" and user not in group_members(grp)):
         # Non-members/managers: bounce to the appropriate hub
         return redirect(url_for("group_chat_manager" if role=="manager" else "my_chats"))
 
     tasks    = load_group_tasks().get(group_id,[])
-    messages = load_group_messages().get(group_id,[])
+    messages = load_group_messages_for(group_id)
     users    = load_users()
 
     parent_endpoint = "group_chat_manager" if role == "manager" else "my_chats"
@@ -3336,7 +3897,7 @@ def view_group(group_id):
     user_seen = seen_map.setdefault(user, {})
     if messages:
         user_seen[group_id] = messages[-1]["timestamp"]
-        save_group_seen(seen_map)
+        save_group_seen_deferred(seen_map)
 
     return render_template("group_chat.html",
                            group=grp,
@@ -3354,7 +3915,7 @@ def groups_mark_all_read():
     msgs_by_group = load_group_messages()
 
     allowed_ids = [g["id"] for g in groups] if role=="manager" else [
-        g["id"] for g in groups if user in g.get("members", [])
+        g["id"] for g in groups if user in group_members(g)
     ]
 
     seen_map = load_group_seen()
@@ -3376,8 +3937,8 @@ def post_group_message(group_id):
     # membership (managers can always post)
     user = require_username()
     role = current_role()
-    group = next((g for g in load_groups() if g["id"] == group_id), None)
-    if not group or (role != "manager" and user not in group.get("members", [])):
+    group = get_group(group_id)
+    if not group or (role != "manager" and user not in group_members(group)):
         flash("Not authorized.", "danger")
         return redirect(url_for("group_chat_manager"))
 
@@ -3391,20 +3952,18 @@ def post_group_message(group_id):
         img.save(os.path.join(app.config["UPLOAD_FOLDER"], safe))
         image_filename = safe
 
-    msgs = load_group_messages()
-    channel = msgs.setdefault(group_id, [])
-    channel.append({
+    message = {
         "sender": user,
         "timestamp": datetime.now().isoformat(timespec="minutes"),
         "text": text,
         "image": image_filename,
         "pinned": False
-    })
-    save_group_messages(msgs)
+    }
+    append_group_message(group_id, message)
 
     # mark sender as read
     seen_map = load_group_seen()
-    seen_map.setdefault(user, {})[group_id] = channel[-1]["timestamp"]
+    seen_map.setdefault(user, {})[group_id] = message["timestamp"]
     save_group_seen(seen_map)
 
     return redirect(url_for("view_group", group_id=group_id))
@@ -3416,18 +3975,17 @@ def pin_message(group_id, idx):
     user = require_username()
     role = current_role()
     groups = load_groups()
-    grp = next((g for g in groups if g["id"]==group_id), None)
+    grp = get_group(group_id, groups)
     if not grp:
         abort(404)
     if not (role=="manager" or user==grp.get("supervisor")):
         flash("Not authorized to pin.", "danger")
         return redirect(url_for("view_group", group_id=group_id))
 
-    msgs = load_group_messages()
-    lst = msgs.get(group_id, [])
+    lst = load_group_messages_for(group_id)
     if 0 <= idx < len(lst):
         lst[idx]["pinned"] = not lst[idx].get("pinned", False)
-        save_group_messages(msgs)
+        save_group_messages_for(group_id, lst)
         flash("Pinned" if lst[idx]["pinned"] else "Unpinned", "info")
     return redirect(url_for("view_group", group_id=group_id))
 
@@ -3439,19 +3997,18 @@ def delete_message(group_id, idx):
     role = current_role()
 
     groups = load_groups()
-    grp = next((g for g in groups if g["id"] == group_id), None)
+    grp = get_group(group_id, groups)
     if not grp:
         abort(404)
 
-    msgs = load_group_messages()
-    lst = msgs.get(group_id, [])
+    lst = load_group_messages_for(group_id)
     if 0 <= idx < len(lst):
         can_delete = (role == "manager") or (user == lst[idx]["sender"])
         if not can_delete:
             flash("You can only delete your messages.", "danger")
             return redirect(url_for("view_group", group_id=group_id))
         lst.pop(idx)
-        save_group_messages(msgs)
+        save_group_messages_for(group_id, lst)
         flash("Message deleted.", "info")
     return redirect(url_for("view_group", group_id=group_id))
 
@@ -3460,7 +4017,7 @@ def delete_message(group_id, idx):
 @demo_guard
 def add_group_member(group_id):
     gs = load_groups()
-    grp = next((g for g in gs if g["id"]==group_id), None)
+    grp = get_group(group_id, gs)
     if grp:
         u = request.form.get("member","").strip().lower()
         if u and u not in grp["members"]:
@@ -3474,7 +4031,7 @@ def add_group_member(group_id):
 @demo_guard
 def remove_group_member(group_id):
     gs = load_groups()
-    grp = next((g for g in gs if g["id"]==group_id), None)
+    grp = get_group(group_id, gs)
     if grp:
         u = request.form.get("member","").strip().lower()
         if u in grp["members"] and u!=grp["supervisor"]:
@@ -3497,8 +4054,8 @@ def add_group_task(group_id):
     # members or managers only
     user = require_username()
     role = current_role()
-    grp  = next((g for g in load_groups() if g["id"]==group_id), None)
-    if not grp or (role!="manager" and user not in grp.get("members",[])):
+    grp  = get_group(group_id)
+    if not grp or (role!="manager" and user not in group_members(grp)):
         flash("Not authorized.", "danger")
         return redirect(url_for("group_chat_manager"))
 
@@ -3523,8 +4080,8 @@ def add_group_task(group_id):
 def toggle_group_task(group_id, idx):
     user = require_username()
     gs   = load_groups()
-    grp  = next((g for g in gs if g["id"]==group_id), None)
-    if not grp or user not in grp.get("members",[]):
+    grp  = get_group(group_id, gs)
+    if not grp or user not in group_members(grp):
         flash("Not authorized.", "danger")
         return redirect(url_for("view_group",group_id=group_id))
 
@@ -3535,7 +4092,8 @@ def toggle_group_task(group_id, idx):
         t["done"] = not t.get("done",False)
         if t["done"]:
             now = datetime.now()
-            t["completed_at"] = now.isoformat(timespec="minutes")
+            now_iso = now.isoformat(timespec="minutes")
+            t["completed_at"] = now_iso
             t["completed_by"] = user
             f = request.files.get("photo")
             if f and allowed_file(f.filename):
@@ -3543,7 +4101,7 @@ def toggle_group_task(group_id, idx):
                 f.save(os.path.join(app.config["UPLOAD_FOLDER"],fn))
                 t["photo"] = fn
             # schedule next week
-            nxt = now + timedelta(weeks=1)
+            nxt_iso = (now + timedelta(weeks=1)).isoformat(timespec="minutes")
             lst.append({
                 "text": t["text"],
                 "priority": t["priority"],
@@ -3551,7 +4109,8 @@ def toggle_group_task(group_id, idx):
                 "notes": t.get("notes",""),
                 "done": False,
                 "created_by": t["created_by"],
-                "created_at": nxt.isoformat(timespec="minutes")
+                "created_at": now_iso,
+                "due_at": nxt_iso
             })
         else:
             for k in ("completed_at","completed_by","photo"):
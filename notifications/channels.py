@@ -3,105 +3,381 @@ from __future__ import annotations
 import json
 import logging
 import os
+import queue
 import smtplib
+import threading
+import time
 from email.message import EmailMessage
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 import requests
+from dataclasses import dataclass
+from email.policy import SMTP as SMTP_POLICY
+from functools import cache
+from requests.adapters import HTTPAdapter, Retry
 
 from .models import NotificationMessage, Recipient
 
 LOGGER = logging.getLogger(__name__)
 
+# Shared session so webhook posts reuse kept-alive connections instead of
+# paying a TCP+TLS handshake per message.
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
+
+def close_http_session() -> None:
+    """Close pooled webhook connections (call on worker shutdown)."""
+    _HTTP_SESSION.close()
+
+
+@dataclass(frozen=True)
+class ChannelConfig:
+    """Channel settings snapshotted from the environment once per process."""
+
+    smtp_host: Optional[str]
+    smtp_port: int
+    smtp_username: Optional[str]
+    smtp_password: Optional[str]
+    smtp_use_tls: bool
+    sender: Optional[str]
+    discord_webhook: Optional[str]
+    discord_bot_name: str
+
+
+@cache
+def get_channel_config() -> ChannelConfig:
+    return ChannelConfig(
+        smtp_host=os.getenv("SMTP_HOST"),
+        smtp_port=int(os.getenv("SMTP_PORT", "587")),
+        smtp_username=os.getenv("SMTP_USERNAME"),
+        smtp_password=os.getenv("SMTP_PASSWORD"),
+        smtp_use_tls=os.getenv("SMTP_USE_TLS", "1") not in {"0", "false", "False"},
+        sender=os.getenv("NOTIFY_FROM_EMAIL") or os.getenv("SMTP_DEFAULT_SENDER"),
+        discord_webhook=os.getenv("DISCORD_WEBHOOK_URL"),
+        discord_bot_name=os.getenv("DISCORD_BOT_NAME", "To-Do Bot"),
+    )
+
+
+def reload_config() -> None:
+    """Re-read channel settings from the environment (used by tests)."""
+    get_channel_config.cache_clear()
 
-def _smtp_connection():
-    host = os.getenv("SMTP_HOST")
-    port = int(os.getenv("SMTP_PORT", "587"))
-    username = os.getenv("SMTP_USERNAME")
-    password = os.getenv("SMTP_PASSWORD")
-    use_tls = os.getenv("SMTP_USE_TLS", "1") not in {"0", "false", "False"}
 
-    if not host:
+def _smtp_connection():
+    config = get_channel_config()
+    if not config.smtp_host:
         return None
 
-    server = smtplib.SMTP(host, port, timeout=10)
+    server = smtplib.SMTP(config.smtp_host, config.smtp_port, timeout=10)
     try:
-        if use_tls:
+        if config.smtp_use_tls:
             server.starttls()
-        if username and password:
-            server.login(username, password)
+        if config.smtp_username and config.smtp_password:
+            server.login(config.smtp_username, config.smtp_password)
     except Exception:
         server.quit()
         raise
     return server
 
 
+class SMTPPool:
+    """Bounded LIFO pool of authenticated SMTP connections.
+
+    The TLS handshake and AUTH round-trips dominate per-message cost, so
+    connections are opened lazily and reused across sends (with an RSET
+    between messages). LIFO checkout keeps hot connections hot; idle
+    connections age out past ``idle_timeout`` and every reused connection is
+    health-checked with NOOP first, because servers drop sessions that sit
+    idle between scheduler ticks.
+    """
+
+    def __init__(
+        self,
+        max_conns: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        pool_wait_timeout: Optional[float] = None,
+    ) -> None:
+        self._max = max_conns or int(os.getenv("SMTP_POOL_SIZE", "4"))
+        self._idle_timeout = idle_timeout or float(os.getenv("SMTP_IDLE_TIMEOUT", "30"))
+        self._wait_timeout = pool_wait_timeout or float(os.getenv("SMTP_POOL_WAIT_TIMEOUT", "10"))
+        self._pool: queue.LifoQueue = queue.LifoQueue(self._max)
+        self._size_lock = threading.Lock()
+        self._size = 0  # live connections, idle or checked out
+
+    def _discard(self, server: smtplib.SMTP) -> None:
+        with self._size_lock:
+            self._size -= 1
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+    def acquire(self) -> Optional[smtplib.SMTP]:
+        """Check out a healthy connection, opening one if under the cap.
+
+        Returns None when SMTP is not configured; raises SMTPException when
+        the pool is exhausted for longer than the wait timeout.
+        """
+        deadline = time.monotonic() + self._wait_timeout
+        while True:
+            try:
+                server, last_used = self._pool.get_nowait()
+            except queue.Empty:
+                with self._size_lock:
+                    can_create = self._size < self._max
+                    if can_create:
+                        self._size += 1
+                if can_create:
+                    try:
+                        server = _smtp_connection()
+                    except Exception:
+                        with self._size_lock:
+                            self._size -= 1
+                        raise
+                    if server is None:
+                        with self._size_lock:
+                            self._size -= 1
+                    return server
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise smtplib.SMTPException("Timed out waiting for a pooled SMTP connection")
+                try:
+                    server, last_used = self._pool.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+            if time.monotonic() - last_used > self._idle_timeout:
+                self._discard(server)
+                continue
+            try:
+                server.noop()
+            except Exception:
+                self._discard(server)
+                continue
+            return server
+
+    def release(self, server: Optional[smtplib.SMTP], ok: bool = True) -> None:
+        if server is None:
+            return
+        if not ok:
+            self._discard(server)
+            return
+        try:
+            self._pool.put_nowait((server, time.monotonic()))
+        except queue.Full:
+            self._discard(server)
+
+    def send(self, email: EmailMessage) -> bool:
+        server = self.acquire()
+        if server is None:
+            LOGGER.warning("SMTP_HOST not configured; email suppressed")
+            return False
+        ok = True
+        try:
+            try:
+                server.send_message(email)
+                server.rset()
+            except smtplib.SMTPServerDisconnected:
+                # Stale connection: reconnect once and retry. Clear the
+                # binding before re-acquiring so the finally block does not
+                # release the discarded connection a second time (which would
+                # drift _size below the real connection count) if acquire
+                # raises here.
+                dead, server = server, None
+                self.release(dead, ok=False)
+                server = self.acquire()
+                if server is None:
+                    return False
+                server.send_message(email)
+                server.rset()
+        except Exception:
+            ok = False
+            raise
+        finally:
+            self.release(server, ok=ok)
+        return True
+
+    def close(self) -> None:
+        """Quit every idle pooled connection."""
+        while True:
+            try:
+                server, _ = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(server)
+
+
+_SMTP_POOL = SMTPPool()
+
+
+def close_smtp_pool() -> None:
+    """Release the pooled SMTP connection (call at end of a dispatch run)."""
+    _SMTP_POOL.close()
+
+
+def build_email(sender: str, message: NotificationMessage) -> EmailMessage:
+    """Assemble the MIME payload once, leaving ``To`` for the caller to fill.
+
+    Fixing the policy and content-transfer-encoding up front means repeated
+    sends of the same message skip the per-call CTE heuristic entirely.
+    """
+    email = EmailMessage(policy=SMTP_POLICY)
+    email["Subject"] = message.subject
+    email["From"] = sender
+    email.set_content(message.body_text, cte="quoted-printable")
+    if message.body_html:
+        email.add_alternative(message.body_html, subtype="html")
+    return email
+
+
+def _sender_address() -> Optional[str]:
+    sender = get_channel_config().sender
+    if not sender:
+        LOGGER.warning("Skipping email notification: NOTIFY_FROM_EMAIL not configured")
+        return None
+    return sender
+
+
 def send_email(recipient: Recipient, message: NotificationMessage) -> bool:
     """Send the notification via SMTP email."""
     if not recipient.email:
         LOGGER.info("Skipping email notification for %s: no address", recipient.username)
         return False
 
-    sender = os.getenv("NOTIFY_FROM_EMAIL") or os.getenv("SMTP_DEFAULT_SENDER")
+    sender = _sender_address()
     if not sender:
-        LOGGER.warning("Skipping email notification: NOTIFY_FROM_EMAIL not configured")
         return False
 
-    email = EmailMessage()
-    email["Subject"] = message.subject
-    email["From"] = sender
+    email = build_email(sender, message)
     email["To"] = recipient.email
-    email.set_content(message.body_text)
-    if message.body_html:
-        email.add_alternative(message.body_html, subtype="html")
 
     try:
-        server = _smtp_connection()
-        if server is None:
-            LOGGER.warning("SMTP_HOST not configured; email suppressed")
+        if not _SMTP_POOL.send(email):
             return False
-        with server:
-            server.send_message(email)
-        LOGGER.info("Sent email notification '%s' to %s", message.subject, recipient.email)
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info("Sent email notification '%s' to %s", message.subject, recipient.email)
         return True
+    except smtplib.SMTPException:
+        # Transient SMTP failures propagate so send_job_task's
+        # autoretry-with-backoff actually sees them.
+        raise
     except Exception as exc:  # pragma: no cover - network dependant
         LOGGER.exception("Failed to send email notification: %s", exc)
         return False
 
 
+# Discord accepts at most 10 embeds per webhook POST.
+DISCORD_EMBED_LIMIT = 10
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _encode_payload(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _post_discord_payload(webhook_url: str, payload: dict) -> bool:
+    try:
+        resp = _HTTP_SESSION.post(
+            webhook_url, data=_encode_payload(payload), headers=_JSON_HEADERS, timeout=5
+        )
+        if resp.status_code >= 400:
+            LOGGER.error(
+                "Discord webhook responded with %s: %s",
+                resp.status_code,
+                resp.content[:120].decode("utf-8", "replace"),
+            )
+            return False
+        return True
+    except requests.RequestException:
+        # Propagate so send_job_task's autoretry-with-backoff sees it.
+        raise
+    except Exception as exc:  # pragma: no cover - network dependant
+        LOGGER.exception("Failed to send discord notification: %s", exc)
+        return False
+
+
 def send_discord(recipient: Recipient, message: NotificationMessage) -> bool:
     """Send the notification to a Discord webhook."""
-    webhook_url = recipient.discord_webhook or os.getenv("DISCORD_WEBHOOK_URL")
+    webhook_url = recipient.discord_webhook or get_channel_config().discord_webhook
     if not webhook_url:
         LOGGER.info("Skipping discord notification for %s: no webhook", recipient.username)
         return False
 
     payload = {
-        "username": os.getenv("DISCORD_BOT_NAME", "To-Do Bot"),
+        "username": get_channel_config().discord_bot_name,
         "content": f"**{message.subject}**\n{message.body_text}",
     }
-    headers = {"Content-Type": "application/json"}
-
-    try:
-        resp = requests.post(webhook_url, headers=headers, data=json.dumps(payload), timeout=5)
-        if resp.status_code >= 400:
-            LOGGER.error("Discord webhook responded with %s: %s", resp.status_code, resp.text[:120])
-            return False
+    if not _post_discord_payload(webhook_url, payload):
+        return False
+    if LOGGER.isEnabledFor(logging.INFO):
         LOGGER.info("Sent discord notification '%s' to %s", message.subject, webhook_url)
-        return True
-    except Exception as exc:  # pragma: no cover - network dependant
-        LOGGER.exception("Failed to send discord notification: %s", exc)
+    return True
+
+
+def send_discord_batch(recipient: Recipient, messages: List[NotificationMessage]) -> bool:
+    """Send several messages to one webhook as embeds in as few POSTs as possible.
+
+    A recipient with overdue, summary, and badge messages gets one HTTPS
+    request instead of three; batches above the embed limit are split.
+    """
+    webhook_url = recipient.discord_webhook or get_channel_config().discord_webhook
+    if not webhook_url:
+        LOGGER.info("Skipping discord notification for %s: no webhook", recipient.username)
         return False
 
+    bot_name = get_channel_config().discord_bot_name
+    delivered = True
+    for start in range(0, len(messages), DISCORD_EMBED_LIMIT):
+        chunk = messages[start:start + DISCORD_EMBED_LIMIT]
+        payload = {
+            "username": bot_name,
+            "embeds": [{"title": m.subject, "description": m.body_text} for m in chunk],
+        }
+        if _post_discord_payload(webhook_url, payload):
+            if LOGGER.isEnabledFor(logging.INFO):
+                LOGGER.info("Sent %d discord notifications to %s", len(chunk), webhook_url)
+        else:
+            delivered = False
+    return delivered
+
+
+_DEFAULT_CHANNELS = frozenset({"email", "discord"})
+
 
 def dispatch(recipient: Recipient, messages: Iterable[NotificationMessage]) -> None:
     """Send messages using all configured channels for the recipient."""
-    channels = set(recipient.channels) if recipient.channels else {"email", "discord"}
-    for msg in messages:
-        delivered = False
-        if "email" in channels:
-            delivered |= send_email(recipient, msg)
-        if "discord" in channels:
-            delivered |= send_discord(recipient, msg)
-        if not delivered:
-            LOGGER.info("Notification '%s' was not delivered to %s", msg.subject, recipient.username)
+    channels = frozenset(recipient.channels) if recipient.channels else _DEFAULT_CHANNELS
+    msgs = list(messages)
+    if not msgs:
+        return
+
+    delivered = [False] * len(msgs)
+    if "email" in channels:
+        for i, msg in enumerate(msgs):
+            delivered[i] |= send_email(recipient, msg)
+    if "discord" in channels:
+        if len(msgs) > 1:
+            if send_discord_batch(recipient, msgs):
+                delivered = [True] * len(msgs)
+        elif send_discord(recipient, msgs[0]):
+            delivered[0] = True
+    if LOGGER.isEnabledFor(logging.INFO):
+        for msg, ok in zip(msgs, delivered):
+            if not ok:
+                LOGGER.info("Notification '%s' was not delivered to %s", msg.subject, recipient.username)
@@ -2,19 +2,21 @@ from __future__ import annotations
 
 import logging
 from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import date
-from typing import Dict, Iterable, List
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from app import (
+    compute_all_completion_stats,
+    empty_completion_stats,
+    get_all_user_badges,
     get_badge_catalog,
     get_next_badge_progress,
-    get_user_badges,
-    get_user_completion_stats,
     load_prefs,
     load_tasks,
     load_users,
     parse_date,
-    task_visible_to,
 )
 from notifications.config import DEFAULT_NOTIFICATION_PREFS
 
@@ -49,44 +51,151 @@ def load_notification_preferences() -> Dict[str, NotificationPreferences]:
     return preferences
 
 
+def _norm(value) -> str:
+    return (value or "").strip().lower()
+
+
+@lru_cache(maxsize=8192)
+def _parse_due(value: Optional[str]) -> Optional[date]:
+    """Memoized due-date parse; the same strings recur every scheduler tick."""
+    return parse_date(value)
+
+
 def _visible_open_tasks_by_user(tasks: Iterable[Dict], users: List[Dict]) -> Dict[str, List[Dict]]:
-    results: Dict[str, List[Dict]] = defaultdict(list)
+    """Bucket open tasks by the users they are visible to in a single pass.
+
+    Mirrors task_visible_to (owner, assigned username, or legacy display-name
+    assignment) but indexes users up front instead of re-scanning every user
+    for every task.
+    """
+    known_usernames = set()
+    display_to_usernames: Dict[str, List[str]] = defaultdict(list)
     for user in users:
-        username = user.get("username")
+        username = _norm(user.get("username"))
         if not username:
             continue
-        normalized = username.lower()
-        for task in tasks:
-            if task.get("done"):
-                continue
-            if task_visible_to(task, normalized, users):
-                results[normalized].append(task)
+        known_usernames.add(username)
+        display = _norm(user.get("display_name"))
+        if display:
+            display_to_usernames[display].append(username)
+
+    results: Dict[str, List[Dict]] = defaultdict(list)
+    for task in tasks:
+        if task.get("done"):
+            continue
+        for username in _visible_usernames_for_task(task, known_usernames, display_to_usernames):
+            results[username].append(task)
     return results
 
 
+def _visible_usernames_for_task(
+    task: Dict,
+    known_usernames: set,
+    display_to_usernames: Dict[str, List[str]],
+) -> set:
+    """The set of usernames a task is visible to; membership checks are O(1)."""
+    targets = set()
+    owner = _norm(task.get("owner") or task.get("created_by"))
+    if owner in known_usernames:
+        targets.add(owner)
+    assigned_username = _norm(task.get("assigned_username"))
+    if assigned_username in known_usernames:
+        targets.add(assigned_username)
+    assigned_display = _norm(task.get("assigned_to"))
+    if assigned_display:
+        targets.update(display_to_usernames.get(assigned_display, ()))
+    return targets
+
+
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+@lru_cache(maxsize=4096)
+def _format_line(label: str, due_date: date, priority: str) -> str:
+    # Direct month lookup instead of strftime, which routes through locale
+    # machinery; the cache catches tasks that appear in several collectors.
+    return f"- {label} (due {_MONTHS[due_date.month - 1]} {due_date.day:02d}, {priority} priority)"
+
+
 def _format_task_line(task: Dict, due_date: date) -> str:
-    label = task.get("text") or "Task"
-    priority = task.get("priority") or "Medium"
-    return f"- {label} (due {due_date.strftime('%b %d')}, {priority} priority)"
+    return _format_line(task.get("text") or "Task", due_date, task.get("priority") or "Medium")
 
 
-def collect_overdue_jobs(today: date, preferences: Dict[str, NotificationPreferences]) -> List[NotificationJob]:
-    users = load_users()
-    tasks = load_tasks()
-    visible = _visible_open_tasks_by_user(tasks, users)
+@dataclass(slots=True)
+class CollectorContext:
+    """Data shared by the collectors so one scheduler tick loads it once.
 
-    jobs: List[NotificationJob] = []
-    for user in users:
-        uname = (user.get("username") or "").lower()
-        if not uname:
-            continue
+    Users load eagerly (they gate everything else); tasks, the visibility
+    map, and the badge catalog load on first access so a tick where no one
+    subscribes to a category never touches the task store for it.
+    """
+
+    users: List[Dict] = field(default_factory=list)
+    users_with_key: List[Tuple[str, Dict]] = field(default_factory=list)
+    _tasks: Optional[List[Dict]] = None
+    _visible: Optional[Dict[str, List[Dict]]] = None
+    _badge_catalog: Optional[Dict[str, Dict]] = None
+
+    @classmethod
+    def load(cls) -> "CollectorContext":
+        users = load_users()
+        return cls(
+            users=users,
+            users_with_key=[
+                (key, user) for user in users if (key := _norm(user.get("username")))
+            ],
+        )
+
+    @property
+    def tasks(self) -> List[Dict]:
+        if self._tasks is None:
+            self._tasks = load_tasks()
+        return self._tasks
+
+    @property
+    def visible(self) -> Dict[str, List[Dict]]:
+        if self._visible is None:
+            self._visible = _visible_open_tasks_by_user(self.tasks, self.users)
+        return self._visible
+
+    @property
+    def badge_catalog(self) -> Dict[str, Dict]:
+        if self._badge_catalog is None:
+            self._badge_catalog = get_badge_catalog()
+        return self._badge_catalog
+
+
+def _eligible_users(
+    ctx: "CollectorContext",
+    preferences: Dict[str, NotificationPreferences],
+    flag: str,
+) -> List[Tuple[str, Dict, NotificationPreferences]]:
+    """Users subscribed to a collector category, resolved before any task I/O."""
+    eligible = []
+    for uname, user in ctx.users_with_key:
         prefs = preferences.get(uname) or NotificationPreferences()
-        if prefs.frequency == "off" or not prefs.overdue_enabled:
-            continue
+        if prefs.frequency != "off" and getattr(prefs, flag):
+            eligible.append((uname, user, prefs))
+    return eligible
+
+
+def collect_overdue_jobs(
+    today: date,
+    preferences: Dict[str, NotificationPreferences],
+    ctx: Optional[CollectorContext] = None,
+) -> List[NotificationJob]:
+    if ctx is None:
+        ctx = CollectorContext.load()
+    eligible = _eligible_users(ctx, preferences, "overdue_enabled")
+    if not eligible:
+        return []
+    visible = ctx.visible
 
+    jobs: List[NotificationJob] = []
+    for uname, user, prefs in eligible:
         overdue_lines: List[str] = []
         for task in visible.get(uname, []):
-            due = parse_date(task.get("due_date") or task.get("due"))
+            due = _parse_due(task.get("due_date") or task.get("due"))
             if due and due < today:
                 overdue_lines.append(_format_task_line(task, due))
 
@@ -117,23 +226,26 @@ def _should_send_summary(prefs: NotificationPreferences, target_date: date) -> b
     return False
 
 
-def collect_daily_summary_jobs(target_date: date, preferences: Dict[str, NotificationPreferences]) -> List[NotificationJob]:
-    users = load_users()
-    tasks = load_tasks()
-    visible = _visible_open_tasks_by_user(tasks, users)
+def collect_daily_summary_jobs(
+    target_date: date,
+    preferences: Dict[str, NotificationPreferences],
+    ctx: Optional[CollectorContext] = None,
+) -> List[NotificationJob]:
+    if ctx is None:
+        ctx = CollectorContext.load()
+    eligible = _eligible_users(ctx, preferences, "summary_enabled")
+    if not eligible:
+        return []
+    visible = ctx.visible
 
     jobs: List[NotificationJob] = []
-    for user in users:
-        uname = (user.get("username") or "").lower()
-        if not uname:
-            continue
-        prefs = preferences.get(uname) or NotificationPreferences()
+    for uname, user, prefs in eligible:
         if not _should_send_summary(prefs, target_date):
             continue
 
         due_today_lines: List[str] = []
         for task in visible.get(uname, []):
-            due = parse_date(task.get("due_date") or task.get("due"))
+            due = _parse_due(task.get("due_date") or task.get("due"))
             if due and due == target_date:
                 due_today_lines.append(_format_task_line(task, due))
 
@@ -154,22 +266,23 @@ def collect_daily_summary_jobs(target_date: date, preferences: Dict[str, Notific
     return jobs
 
 
-def collect_badge_progress_jobs(preferences: Dict[str, NotificationPreferences]) -> List[NotificationJob]:
-    users = load_users()
-    tasks = load_tasks()
-    badge_catalog = get_badge_catalog()
+def collect_badge_progress_jobs(
+    preferences: Dict[str, NotificationPreferences],
+    ctx: Optional[CollectorContext] = None,
+) -> List[NotificationJob]:
+    if ctx is None:
+        ctx = CollectorContext.load()
+    eligible = _eligible_users(ctx, preferences, "badge_enabled")
+    if not eligible:
+        return []
+    badge_catalog = ctx.badge_catalog
+    all_stats = compute_all_completion_stats(ctx.tasks)
+    badges_by_user = get_all_user_badges()
 
     jobs: List[NotificationJob] = []
-    for user in users:
-        uname = (user.get("username") or "").lower()
-        if not uname:
-            continue
-        prefs = preferences.get(uname) or NotificationPreferences()
-        if prefs.frequency == "off" or not prefs.badge_enabled:
-            continue
-
-        stats = get_user_completion_stats(uname, tasks)
-        earned = get_user_badges(uname)
+    for uname, user, prefs in eligible:
+        stats = all_stats.get(uname) or empty_completion_stats()
+        earned = badges_by_user.get(uname, [])
         earned_slugs = {badge.get("slug") for badge in earned}
         progress = get_next_badge_progress(stats, earned_slugs, badge_catalog)
         if not progress or not progress.get("remaining"):
@@ -192,6 +305,7 @@ def collect_badge_progress_jobs(preferences: Dict[str, NotificationPreferences])
 
 
 __all__ = [
+    "CollectorContext",
     "load_notification_preferences",
     "collect_overdue_jobs",
     "collect_daily_summary_jobs",
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Sequence
+from typing import Dict, List, Optional, Tuple
 
 
 @dataclass(slots=True)
@@ -11,7 +11,7 @@ class Recipient:
     username: str
     email: Optional[str] = None
     discord_webhook: Optional[str] = None
-    channels: Sequence[str] = field(default_factory=list)
+    channels: Tuple[str, ...] = ()
 
 
 @dataclass(slots=True)
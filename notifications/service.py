@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Dict, Iterable, List
 
@@ -26,12 +28,11 @@ class NotificationPreferences:
 
 
 def build_recipient(username: str, preferences: NotificationPreferences, profile: Dict[str, str]) -> Recipient:
-    channels = preferences.effective_channels()
     return Recipient(
         username=username,
         email=profile.get("email"),
         discord_webhook=profile.get("discord_webhook"),
-        channels=channels,
+        channels=tuple(preferences.effective_channels()),
     )
 
 
@@ -40,14 +41,25 @@ def create_message(subject: str, body_lines: Iterable[str], *, category: str = "
     return NotificationMessage(subject=subject, body_text=body_text, category=category)
 
 
+def _deliver_one(job: NotificationJob, dispatcher) -> bool:
+    try:
+        dispatcher(job.recipient, job.messages)
+        return True
+    except Exception:  # pragma: no cover - fatal logging only
+        LOGGER.exception("Failed to dispatch notifications for %s", job.recipient.username)
+        return False
+
+
 def deliver_jobs(jobs: Iterable[NotificationJob], dispatcher) -> int:
-    delivered = 0
-    for job in jobs:
-        if not job.messages:
-            continue
-        try:
-            dispatcher(job.recipient, job.messages)
-            delivered += 1
-        except Exception:  # pragma: no cover - fatal logging only
-            LOGGER.exception("Failed to dispatch notifications for %s", job.recipient.username)
-    return delivered
+    """Dispatch jobs over a bounded thread pool; sends are blocking socket I/O."""
+    pending = [job for job in jobs if job.messages]
+    if not pending:
+        return 0
+
+    max_workers = min(len(pending), int(os.getenv("NOTIFY_WORKERS", "16")))
+    if max_workers <= 1:
+        return sum(1 for job in pending if _deliver_one(job, dispatcher))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda job: _deliver_one(job, dispatcher), pending)
+        return sum(1 for ok in results if ok)
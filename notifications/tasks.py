@@ -1,59 +1,110 @@
 from __future__ import annotations
 
 import logging
+import smtplib
+from dataclasses import asdict
 from datetime import date, datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
-from celery import shared_task
+import requests
+from celery import group, shared_task
+from celery.signals import worker_process_shutdown
 
-from .channels import dispatch
+from .channels import close_http_session, close_smtp_pool, dispatch
 from .collectors import (
+    CollectorContext,
     collect_badge_progress_jobs,
     collect_daily_summary_jobs,
     collect_overdue_jobs,
     load_notification_preferences,
 )
-from .models import NotificationJob
-from .service import deliver_jobs
+from .models import NotificationJob, NotificationMessage, Recipient
 
 LOGGER = logging.getLogger(__name__)
 
 
-def _merge_jobs(primary: List[NotificationJob], extra: List[NotificationJob]) -> List[NotificationJob]:
-    job_map: Dict[str, NotificationJob] = {job.recipient.username: job for job in primary}
+def _merge_jobs(primary: List[NotificationJob], extra: List[NotificationJob]) -> Iterable[NotificationJob]:
+    """Merge job lists by recipient, preserving primary order.
+
+    Returns a view consumed directly by the fan-out, so no intermediate
+    list is materialized.
+    """
+    job_map: Dict[str, NotificationJob] = {}
+    for job in primary:
+        job_map.setdefault(job.recipient.username.lower(), job)
     for job in extra:
-        key = job.recipient.username
-        if key in job_map:
-            job_map[key].messages.extend(job.messages)
-        else:
-            job_map[key] = job
-    return list(job_map.values())
+        kept = job_map.setdefault(job.recipient.username.lower(), job)
+        if kept is not job:
+            kept.messages.extend(job.messages)
+    return job_map.values()
+
+
+def _fan_out_jobs(jobs: Iterable[NotificationJob]) -> int:
+    """Queue one send_job_task per recipient and return how many were queued.
+
+    The scheduler task only collects and enqueues; the blocking SMTP/HTTP
+    I/O runs in per-job subtasks spread across the worker pool, each with
+    its own retry-with-backoff instead of whole-batch failure.
+    """
+    signatures = [
+        send_job_task.s(asdict(job.recipient), [asdict(m) for m in job.messages])
+        for job in jobs
+        if job.messages
+    ]
+    if not signatures:
+        return 0
+    group(signatures).apply_async()
+    return len(signatures)
+
+
+@shared_task(
+    name="notifications.tasks.send_job",
+    acks_late=True,
+    autoretry_for=(requests.RequestException, smtplib.SMTPException),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 3},
+)
+def send_job_task(recipient_data: Dict, messages_data: List[Dict]) -> bool:
+    recipient = Recipient(**recipient_data)
+    messages = [NotificationMessage(**data) for data in messages_data]
+    dispatch(recipient, messages)
+    return True
+
+
+@worker_process_shutdown.connect
+def _close_channel_pools(**_kwargs) -> None:
+    """Release pooled SMTP/HTTP connections when a worker process exits."""
+    close_smtp_pool()
+    close_http_session()
 
 
 @shared_task(name="notifications.tasks.schedule_overdue_alerts")
 def schedule_overdue_alerts() -> str:
     today = date.today()
     prefs = load_notification_preferences()
-    jobs = collect_overdue_jobs(today, prefs)
-    delivered = deliver_jobs(jobs, dispatch)
-    LOGGER.info("Sent %d overdue notifications", delivered)
-    return str(delivered)
+    ctx = CollectorContext.load()
+    jobs = collect_overdue_jobs(today, prefs, ctx)
+    queued = _fan_out_jobs(jobs)
+    LOGGER.info("Queued %d overdue notifications", queued)
+    return str(queued)
 
 
 @shared_task(name="notifications.tasks.schedule_daily_summaries")
 def schedule_daily_summaries() -> str:
     today = date.today()
     prefs = load_notification_preferences()
-    summary_jobs = collect_daily_summary_jobs(today, prefs)
-    badge_jobs = collect_badge_progress_jobs(prefs)
+    ctx = CollectorContext.load()
+    summary_jobs = collect_daily_summary_jobs(today, prefs, ctx)
+    badge_jobs = collect_badge_progress_jobs(prefs, ctx)
     jobs = _merge_jobs(summary_jobs, badge_jobs)
-    delivered = deliver_jobs(jobs, dispatch)
-    LOGGER.info("Dispatched %d daily summary notifications", delivered)
-    return str(delivered)
+    queued = _fan_out_jobs(jobs)
+    LOGGER.info("Queued %d daily summary notifications", queued)
+    return str(queued)
 
 
 @shared_task(name="notifications.tasks.deliver_jobs")
 def deliver_jobs_task(payload: List[Dict]) -> str:
     # Payload-based dispatch left for future extensibility
-    LOGGER.info("deliver_jobs_task invoked with %d payload items", len(payload))
+    if LOGGER.isEnabledFor(logging.INFO):
+        LOGGER.info("deliver_jobs_task invoked with %d payload items", len(payload))
     return str(len(payload))
@@ -0,0 +1,88 @@
+import smtplib
+
+from notifications import channels
+
+
+class FakeServer:
+    def __init__(self, fail_sends=0):
+        self.fail_sends = fail_sends
+        self.sent = 0
+        self.quit_calls = 0
+
+    def noop(self):
+        pass
+
+    def send_message(self, email):
+        if self.fail_sends > 0:
+            self.fail_sends -= 1
+            raise smtplib.SMTPServerDisconnected("stale")
+        self.sent += 1
+
+    def rset(self):
+        pass
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+def test_pool_reuses_connection(monkeypatch):
+    servers = []
+
+    def connect():
+        server = FakeServer()
+        servers.append(server)
+        return server
+
+    monkeypatch.setattr(channels, "_smtp_connection", connect)
+    pool = channels.SMTPPool(max_conns=2, idle_timeout=30, pool_wait_timeout=0.1)
+
+    assert pool.send(object())
+    assert pool.send(object())
+    assert len(servers) == 1
+    assert servers[0].sent == 2
+    assert pool._size == 1
+
+
+def test_pool_reconnects_once_on_stale_connection(monkeypatch):
+    servers = []
+
+    def connect():
+        server = FakeServer(fail_sends=0 if servers else 1)
+        servers.append(server)
+        return server
+
+    monkeypatch.setattr(channels, "_smtp_connection", connect)
+    pool = channels.SMTPPool(max_conns=2, idle_timeout=30, pool_wait_timeout=0.1)
+
+    assert pool.send(object())
+    assert len(servers) == 2
+    assert servers[0].quit_calls == 1
+    assert servers[1].sent == 1
+    assert pool._size == 1
+
+
+def test_pool_size_survives_failed_reconnect(monkeypatch):
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            return FakeServer(fail_sends=1)
+        raise smtplib.SMTPException("reconnect refused")
+
+    monkeypatch.setattr(channels, "_smtp_connection", connect)
+    pool = channels.SMTPPool(max_conns=1, idle_timeout=30, pool_wait_timeout=0.1)
+
+    try:
+        pool.send(object())
+    except smtplib.SMTPException:
+        pass
+    else:
+        raise AssertionError("Expected SMTPException from failed reconnect")
+
+    # The discarded connection must be decremented exactly once, so the cap
+    # still admits a replacement afterwards.
+    assert pool._size == 0
+    monkeypatch.setattr(channels, "_smtp_connection", lambda: FakeServer())
+    assert pool.send(object())
+    assert pool._size == 1
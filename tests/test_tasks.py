@@ -0,0 +1,138 @@
+import app
+
+
+def _login(client, monkeypatch, username="manager", role="manager"):
+    record = {
+        "username": username,
+        "password": app.generate_password_hash("secret"),
+        "role": role,
+        "display_name": username.title(),
+    }
+
+    def fake_find(user_id):
+        return record if user_id == username else None
+
+    monkeypatch.setattr(app, "find_user_record", fake_find)
+
+    with client.session_transaction() as sess:
+        sess["_user_id"] = username
+        sess["_fresh"] = True
+        sess["username"] = username
+        sess["role"] = role
+        sess["_csrf"] = "test-token"
+
+    return record
+
+
+def test_find_task_prefers_id_over_position():
+    tasks = [
+        {"id": "task-a", "text": "First"},
+        {"id": "1", "text": "Second"},
+    ]
+
+    idx, task = app.find_task(tasks, "task-a")
+    assert idx == 0
+    assert task["text"] == "First"
+
+    # An id that looks like an index still matches by id first.
+    idx, task = app.find_task(tasks, "1")
+    assert idx == 1
+    assert task["text"] == "Second"
+
+    idx, task = app.find_task(tasks, "missing")
+    assert idx is None
+    assert task is None
+
+
+def test_toggle_recurring_clone_gets_new_id(monkeypatch):
+    tasks_store = [
+        {
+            "id": "task-1",
+            "text": "Water plants",
+            "done": False,
+            "priority": "Medium",
+            "recurring": "weekly",
+            "due_date": "2024-01-01",
+        }
+    ]
+    saved: list[dict] = []
+
+    monkeypatch.setattr(app, "load_tasks", lambda: tasks_store)
+    monkeypatch.setattr(app, "save_tasks", lambda updated: saved.extend(updated))
+    monkeypatch.setattr(app, "load_users", lambda: [])
+    monkeypatch.setattr(app, "award_badges_for_user", lambda username, tasks=None: [])
+
+    with app.app.test_client() as client:
+        _login(client, monkeypatch)
+        response = client.post("/toggle/task-1", data={"csrf_token": "test-token"})
+
+    assert response.status_code == 302
+    assert len(saved) == 2
+    parent, clone = saved
+    assert parent["done"] is True
+    assert clone["done"] is False
+    assert clone["due_date"] == "2024-01-08"
+    assert clone["id"] and clone["id"] != parent["id"]
+
+
+def test_add_rejects_duplicate_assigned_task(monkeypatch):
+    existing = [
+        {
+            "id": "task-1",
+            "text": "Restock towels",
+            "done": False,
+            "assigned_username": "nick",
+            "created_by": "alice",
+            "owner": "alice",
+            "due_date": "",
+        }
+    ]
+    appended: list[dict] = []
+
+    monkeypatch.setattr(app, "load_tasks", lambda: existing)
+    monkeypatch.setattr(app, "append_task", appended.append)
+    monkeypatch.setattr(app, "load_users", lambda: [])
+
+    with app.app.test_client() as client:
+        _login(client, monkeypatch)
+        response = client.post(
+            "/add",
+            data={
+                "task": "Restock towels",
+                "assigned_to": "nick",
+                "csrf_token": "test-token",
+            },
+        )
+
+    assert response.status_code == 302
+    assert appended == []
+
+
+def test_add_allows_same_text_for_different_creators(monkeypatch):
+    existing = [
+        {
+            "id": "task-1",
+            "text": "Stretch",
+            "done": False,
+            "assigned_username": None,
+            "created_by": "alice",
+            "owner": "alice",
+            "due_date": "",
+        }
+    ]
+    appended: list[dict] = []
+
+    monkeypatch.setattr(app, "load_tasks", lambda: existing)
+    monkeypatch.setattr(app, "append_task", appended.append)
+    monkeypatch.setattr(app, "load_users", lambda: [])
+
+    with app.app.test_client() as client:
+        _login(client, monkeypatch, username="bob", role="member")
+        response = client.post(
+            "/add",
+            data={"task": "Stretch", "csrf_token": "test-token"},
+        )
+
+    assert response.status_code == 302
+    assert len(appended) == 1
+    assert appended[0]["created_by"] == "bob"